@@ -1,5 +1,10 @@
 from .greedyheuristic import greedy_heuristic_solver
 from .simulatedannealing import simulated_annealing_with_random
+from .grasp import grasp_solver
+from .portfolio import portfolio_solver
+from .largeneighbourhoodsearch import large_neighbourhood_search_solver
+from .branchandbound import branch_and_bound_solver
+from .batchedannealing import batched_simulated_annealing_with_random
 
 algorithms = {
     "1": {
@@ -8,6 +13,27 @@ algorithms = {
     },
     "2": {
         "algorithm": simulated_annealing_with_random,
+        "checkpointing": True,      # accepts the checkpoint_path and resume arguments
         "description": "Simulated Annealing algorithm with random initialisation"
+    },
+    "3": {
+        "algorithm": grasp_solver,
+        "description": "GRASP algorithm (randomised greedy restarts run in parallel)"
+    },
+    "4": {
+        "algorithm": portfolio_solver,
+        "description": "Portfolio of all the other algorithms run concurrently under a shared time budget"
+    },
+    "5": {
+        "algorithm": large_neighbourhood_search_solver,
+        "description": "Large Neighbourhood Search algorithm (destroy and greedy repair)"
+    },
+    "6": {
+        "algorithm": branch_and_bound_solver,
+        "description": "Branch and Bound algorithm (exact, for small instances)"
+    },
+    "7": {
+        "algorithm": batched_simulated_annealing_with_random,
+        "description": "Simulated Annealing algorithm with random initialisation and batched neighbour evaluation"
     }
 }
@@ -0,0 +1,218 @@
+import time
+import math
+import numpy as np
+from .simulatedannealing import hyperparameters as sa_hyperparameters, compute_initial_temp, update_temp, update_phase_length
+from .bounds import compute_upper_bound, compute_gap, compute_stop_gain
+
+
+# The annealing schedule (alpha, beta, min_temp, initial_phase_length, etc.) and the size of the moves
+# (n_change_parameter) are shared with the (unbatched) Simulated Annealing algorithm.
+hyperparameters = {
+    "batch_size": 64,               # the maximal number of neighbours generated and evaluated at once
+    "acceptance": "metropolis",     # "metropolis" - the first neighbour of the batch accepted by the Metropolis criterion is
+                                    #                moved to, which is equivalent to evaluating the neighbours one by one;
+                                    # "best" - the best neighbour of the batch is moved to if accepted by the Metropolis criterion
+    "seed": None                    # seed of the random generator, None means unseeded
+}
+
+
+# Build the data structures used by the vectorised evaluation. The configuration is represented by the task that each
+# employee is assigned to, together with the coverage matrix, which counts for each task and skill the number of
+# assigned employees offering the skill. A task is completed iff all its required skills have a non-zero count.
+#
+# @return a dictionary with the skill matrices, the gains and, for each employee, the tasks assignable to the employee
+#         (in a flattened form: the tasks of employee e are assignable_tasks[ offsets[e] : offsets[e] + counts[e] ])
+def build_problem(employees_df, tasks_df, gains):
+    employee_skills = ( employees_df.to_numpy() != 0 ).astype(np.int32)
+    task_skills = tasks_df.to_numpy() != 0
+
+    # an employee can be assigned to a task iff it offers at least one of the task's skills
+    assignable = ( employee_skills @ task_skills.T.astype(np.int32) ) > 0
+    counts = assignable.sum(axis = 1)
+
+    return {
+        "employee skills": employee_skills,
+        "task skills": task_skills,
+        "gains": np.array( [ gains[task_name] for task_name in tasks_df.index ], dtype = np.int64 ),
+        "assignable tasks": np.nonzero(assignable)[1],
+        "offsets": np.concatenate( [ [0], np.cumsum(counts)[:-1] ] ).astype(np.int64),
+        "counts": counts
+    }
+
+
+def sample_tasks(employees, problem, rng):
+    choices = ( rng.random(employees.shape) * problem["counts"][employees] ).astype(np.int64)
+
+    return problem["assignable tasks"][ problem["offsets"][employees] + choices ]
+
+
+# Sample n distinct employees for each of the m neighbours.
+def sample_employees(m, n, n_employees, rng):
+    if n > n_employees:
+        raise Exception("Simulated Annealing Error: n-change parameter cannot be larger than the number of employees")
+
+    if n_employees <= 64:
+        return np.argsort( rng.random( (m, n_employees) ), axis = 1 )[:, 0 : n]
+
+    employees = rng.integers( n_employees, size = (m, n) )
+    while n > 1:
+        employees_sorted = np.sort(employees, axis = 1)
+        repeated = ( employees_sorted[:, 1:] == employees_sorted[:, :-1] ).any(axis = 1)
+        if not repeated.any():
+            break
+        employees[repeated] = rng.integers( n_employees, size = ( repeated.sum(), n ) )
+
+    return employees
+
+
+def is_completed(coverage, task_skills):
+    return ~( ( coverage <= 0 ) & task_skills ).any(axis = -1)
+
+
+# Generate m random neighbours of the configuration (each reassigning n random employees to random assignable
+# tasks, as in n_change(...)) and compute their cost differences in a single vectorised pass.
+#
+# Each neighbour can only change the completion of the (at most 2n) tasks that its employees leave or join.
+# For each of these tasks, the new coverage is the current one plus the skills of the employees joining the
+# task minus the skills of the employees leaving it.
+#
+# @return ( employees, new_tasks, cost_differences ) - the employees reassigned by each neighbour (m x n),
+#                                                     their new tasks (m x n) and the cost differences (m)
+def evaluate_neighbours(m, task_of, coverage, completed, problem, rng):
+    n = sa_hyperparameters["n_change_parameter"]
+
+    employees = sample_employees( m, n, len(task_of), rng )
+    new_tasks = sample_tasks(employees, problem, rng)
+    old_tasks = task_of[employees]
+
+    # the tasks affected by each neighbour
+    affected = np.concatenate( [ old_tasks, new_tasks ], axis = 1 )
+
+    # sign[k, j, i] is +1 if the i-th employee of the k-th neighbour joins the j-th affected task, -1 if it leaves it
+    sign = ( new_tasks[:, None, :] == affected[:, :, None] ).astype(np.int32) - ( old_tasks[:, None, :] == affected[:, :, None] )
+    new_coverage = coverage[affected] + np.einsum( "kji,kis->kjs", sign, problem["employee skills"][employees] )
+
+    new_completed = is_completed( new_coverage, problem["task skills"][affected] )
+    completion_change = new_completed.astype(np.int64) - completed[affected]
+
+    # a task can appear among the affected tasks of a neighbour more than once, but must only be counted once
+    repeated = ( ( affected[:, :, None] == affected[:, None, :] ) & np.tri( 2 * n, k = -1, dtype = bool ) ).any(axis = 2)
+
+    cost_differences = ( completion_change * problem["gains"][affected] * ~repeated ).sum(axis = 1)
+
+    return employees, new_tasks, cost_differences
+
+
+# Move to the given neighbour, updating the configuration in place.
+def apply_neighbour(employees, new_tasks, task_of, coverage, completed, problem):
+    affected = np.concatenate( [ task_of[employees], new_tasks ] )
+
+    for employee, new_task in zip(employees, new_tasks):
+        coverage[ task_of[employee] ] -= problem["employee skills"][employee]
+        coverage[new_task] += problem["employee skills"][employee]
+        task_of[employee] = new_task
+
+    completed[affected] = is_completed( coverage[affected], problem["task skills"][affected] )
+
+
+# Simulated Annealing with the neighbours generated and evaluated in batches using numpy operations on the coverage
+# matrix, rather than one by one on sets of assignments. Each evaluated neighbour counts as one iteration of the
+# phase. The search starts from a random configuration, as in random_init(...).
+#
+# With the "metropolis" acceptance, the neighbours after the first accepted one are wasted, so the batches are only
+# as large as needed to expect a couple of accepted neighbours, based on the acceptance rate observed so far; while
+# the temperature is high, the batches are small, and they grow up to "batch_size" as the search cools down.
+#
+# @param stop_cost - (optional) the search is stopped as soon as a configuration with at least this cost is found
+# @param time_limit - (optional) the search is stopped after this many seconds
+# @return ( solution, total_gain ) - the best configuration found and its cost
+def batched_simulated_annealing(employees_df, tasks_df, gains, stop_cost = None, time_limit = None):
+    if hyperparameters["acceptance"] not in ("metropolis", "best"):
+        raise Exception('Simulated Annealing Error: unknown acceptance strategy "' + str(hyperparameters["acceptance"]) + '"')
+
+    start_time = time.time()
+    rng = np.random.default_rng( hyperparameters["seed"] )
+    problem = build_problem(employees_df, tasks_df, gains)
+
+    # generate a random initial configuration, i.e. assign every employee to a random assignable task
+    task_of = sample_tasks( np.arange( len(employees_df.index) ), problem, rng )
+    coverage = np.zeros( problem["task skills"].shape, dtype = np.int32 )
+    np.add.at( coverage, task_of, problem["employee skills"] )
+    completed = is_completed( coverage, problem["task skills"] )
+
+    current_cost = int( problem["gains"][completed].sum() )
+    best_task_of = task_of.copy()
+    best_cost = current_cost
+
+    phase_length = sa_hyperparameters["initial_phase_length"]
+    temp = compute_initial_temp(gains)
+
+    acceptance_rate = 1.0   # running estimate of the probability that a neighbour is accepted
+
+    finished = stop_cost is not None and best_cost >= stop_cost
+    while not finished:
+        iteration = 0
+        while iteration < phase_length:
+            if time_limit is not None and time.time() - start_time >= time_limit:
+                finished = True
+                break
+
+            m = min( hyperparameters["batch_size"], phase_length - iteration )
+            if hyperparameters["acceptance"] == "metropolis":
+                m = min( m, math.ceil( 2 / max(acceptance_rate, 1e-3) ) )
+
+            employees, new_tasks, cost_differences = evaluate_neighbours(m, task_of, coverage, completed, problem, rng)
+
+            # remember, higher cost is better; the neighbours that are not worse are always accepted
+            accepted = np.exp( np.minimum(cost_differences, 0) / temp ) >= rng.random(m)
+            acceptance_rate = 0.9 * acceptance_rate + 0.1 * accepted.mean()
+
+            if hyperparameters["acceptance"] == "metropolis":
+                accepted_indices = np.flatnonzero(accepted)
+                chosen = accepted_indices[0] if len(accepted_indices) > 0 else None
+                iteration += m if chosen is None else chosen + 1
+            else:
+                chosen = np.argmax(cost_differences)
+                chosen = chosen if accepted[chosen] else None
+                iteration += m
+
+            if chosen is None:
+                continue
+
+            apply_neighbour( employees[chosen], new_tasks[chosen], task_of, coverage, completed, problem )
+            current_cost += int( cost_differences[chosen] )
+
+            if current_cost > best_cost:    # if the best config yet, update the best
+                best_task_of = task_of.copy()
+                best_cost = current_cost
+
+                if stop_cost is not None and best_cost >= stop_cost:  # good enough, no need to search any further
+                    finished = True
+                    break
+
+        phase_length = update_phase_length(phase_length)
+        temp = update_temp(temp)
+
+        if temp < sa_hyperparameters["min_temp"]:  # stopping criterion for the search
+            finished = True
+
+    solution = { ( employees_df.index[e], tasks_df.index[t] ) for e, t in enumerate(best_task_of) }
+
+    return solution, best_cost
+
+
+def batched_simulated_annealing_with_random(employees_df, tasks_df, gains):
+    start_time = time.time()
+    upper_bound = compute_upper_bound(employees_df, tasks_df, gains)
+    solution, total_gain = batched_simulated_annealing( employees_df, tasks_df, gains, stop_cost = compute_stop_gain(upper_bound) )
+    end_time = time.time()
+
+    result = {
+        "solution": solution,
+        "total gain": total_gain,
+        "running time": end_time - start_time,
+        "upper bound": upper_bound,
+        "gap": compute_gap(total_gain, upper_bound)
+    }
+
+    return result
@@ -0,0 +1,106 @@
+import math
+import numpy as np
+
+
+hyperparameters = {
+    "n_iterations": 200,    # the number of subgradient iterations used to tighten the Lagrangian bound
+    "gap_threshold": 0.0    # the solvers stop as soon as the gap of their best solution is at or below this value,
+                            # e.g. 0.01 means "within 1% of the bound"; 0 means only when the bound is reached
+}
+
+
+# Compute for each task a lower bound on the number of employees needed to complete it, i.e. the number of
+# its skills divided by the largest number of its skills offered by a single employee. Finding the smallest
+# cover exactly is a set cover problem, which takes exponential time on tasks with many skills.
+def compute_min_cover_sizes(employee_skills, task_skills):
+    n_required = task_skills.sum(axis = 1)
+
+    if employee_skills.shape[0] == 0:
+        return n_required
+
+    max_offered = ( task_skills.astype(np.int64) @ employee_skills.T.astype(np.int64) ).max(axis = 1)
+
+    return np.ceil( n_required / np.maximum(max_offered, 1) )
+
+
+# A task can only be completed if each of its skills is offered by a different employee than for the other completed
+# tasks requiring that skill, so no more tasks requiring a skill can be completed than there are employees offering it
+# (the supply of the skill). Each skill alone then gives a bound by dropping the lowest-gain tasks in excess of the
+# supply; the tightest of these bounds is returned.
+def compute_supply_bound(task_gains, task_skills, supply):
+    total = task_gains.sum()
+    bound = total
+
+    demand = task_skills.sum(axis = 0)
+    for skill in np.flatnonzero(demand > supply):
+        requiring = np.sort( task_gains[ task_skills[:, skill] ] )
+        bound = min( bound, total - requiring[ 0 : demand[skill] - supply[skill] ].sum() )
+
+    return bound
+
+
+# Compute the Lagrangian bound of the relaxed problem in which the only constraints are that each skill is required
+# by at most as many completed tasks as there are employees offering it, and that the completed tasks need at most
+# as many employees as there are in total. For any non-negative multipliers of these constraints, the maximal
+# Lagrangian (where a task is completed iff its reduced gain is positive) is an upper bound on the total gain; the
+# multipliers are tightened with the subgradient method and the lowest bound found is returned.
+def compute_lagrangian_bound(task_gains, task_skills, supply, min_cover_sizes, n_employees):
+    # the constraints in matrix form, i.e. constraints @ x <= limits, one row per skill plus one for the employees
+    constraints = np.vstack( [ task_skills.T, min_cover_sizes[None, :] ] ).astype(float)
+    limits = np.append(supply, n_employees).astype(float)
+
+    multipliers = np.zeros( len(limits) )
+    step = task_gains.mean()
+    bound = task_gains.sum()
+    for k in range( hyperparameters["n_iterations"] ):
+        reduced_gains = task_gains - multipliers @ constraints
+        completed = reduced_gains > 0
+
+        bound = min( bound, multipliers @ limits + reduced_gains[completed].sum() )
+
+        subgradient = limits - constraints[:, completed].sum(axis = 1)
+        norm = np.linalg.norm(subgradient)
+        if norm == 0:   # the multipliers are optimal
+            break
+
+        multipliers = np.maximum( 0, multipliers - step / math.sqrt(k + 1) * subgradient / norm )
+
+    return bound
+
+
+# Compute a cheap upper bound on the total gain of any solution from the preprocessed problem instance.
+#
+# @return the upper bound (an integer)
+def compute_upper_bound(employees_df, tasks_df, gains):
+    employee_skills = employees_df.to_numpy() != 0
+    task_skills = tasks_df.to_numpy() != 0
+    task_gains = np.array( [ gains[task_name] for task_name in tasks_df.index ], dtype = float )
+
+    if len(task_gains) == 0:
+        return 0
+
+    supply = employee_skills.sum(axis = 0)
+    min_cover_sizes = compute_min_cover_sizes(employee_skills, task_skills)
+
+    bound = min(
+        compute_supply_bound(task_gains, task_skills, supply),
+        compute_lagrangian_bound(task_gains, task_skills, supply, min_cover_sizes, employee_skills.shape[0])
+    )
+
+    # gains are integers, so the bound can be rounded down (allowing for floating point errors)
+    return int( math.floor(bound + 1e-6) )
+
+
+# @return the relative gap between the total gain of a solution and the upper bound, e.g. 0.05 means that
+#         the solution is guaranteed to be within 5% of the optimum
+def compute_gap(total_gain, upper_bound):
+    if upper_bound <= 0:
+        return 0.0
+
+    return max( 0.0, (upper_bound - total_gain) / upper_bound )
+
+
+# @return the smallest total gain for which the gap falls to or below the "gap_threshold"; the solvers can stop
+#         as soon as they find a solution with at least this total gain
+def compute_stop_gain(upper_bound):
+    return math.ceil( upper_bound * ( 1 - hyperparameters["gap_threshold"] ) - 1e-6 )
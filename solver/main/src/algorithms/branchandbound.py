@@ -0,0 +1,358 @@
+import sys
+import math
+import time
+import numpy as np
+from .greedyheuristic import compute_h_values, greedy_heuristic
+from .bounds import compute_min_cover_sizes, compute_supply_bound, compute_upper_bound, compute_gap, compute_stop_gain
+
+
+hyperparameters = {
+    "time_limit": 60,           # the search is stopped after this many seconds, returning the best solution found
+    "node_limit": 10000000,     # the search is stopped after visiting this many nodes, returning the best solution found
+    "assignment_node_limit": 20000  # the effort spent on finding an assignment for a set of tasks before giving up on the set;
+                                    # if it is ever exceeded, the solution found is no longer guaranteed to be optimal
+}
+
+
+# Encode the skills of each entity (employee or task) as a bitset, i.e. an integer whose i-th bit is set
+# if the entity offers (or requires) the i-th skill.
+#
+# @return a list of bitsets, one per row of the dataframe
+def encode_skills(entities_df):
+    weights = [ 1 << i for i in range( len(entities_df.columns) ) ]
+
+    return [ sum( w for w, value in zip(weights, row) if value != 0 ) for row in entities_df.itertuples(index = False) ]
+
+
+def count_bits(bitset):
+    return bin(bitset).count("1")
+
+
+def iterate_bits(bitset):
+    while bitset:
+        lowest = bitset & -bitset
+        yield lowest.bit_length() - 1
+        bitset ^= lowest
+
+
+# Generate the minimal sets of available employees that together offer all the required skills of a task.
+# The covers are built by repeatedly choosing the uncovered skill offered by the fewest available employees
+# (the most-constraining skill, as in the greedy heuristic) and branching on the employees that offer it.
+# An employee is excluded from the branches that follow its own, so no cover is generated twice.
+#
+# @param task_skills - the bitset of skills required by the task
+# @param required - the bitset of skills that still have to be covered
+# @param available - the bitset of employees that can still be used
+# @param chosen - the bitset of employees chosen so far
+# @param relevant - the bitset of skills that matter for the rest of the search; employees offering the same
+#                   relevant skills are interchangeable, so only one of them is tried
+# @param state - every call counts as a visited node, so that generating the covers respects the node and time limit
+# @return generator of bitsets of employees
+def generate_covers(task_skills, required, available, chosen, relevant, problem, state):
+    if not visit_node(state):
+        return
+
+    if required == 0:
+        if is_minimal_cover(task_skills, chosen, problem):
+            yield chosen
+        return
+
+    skill_employees = problem["skill employees"]
+    employee_skills = problem["employee skills"]
+
+    skill = min( iterate_bits(required), key = lambda s: count_bits( skill_employees[s] & available ) )
+    candidates = list( iterate_bits( skill_employees[skill] & available ) )
+
+    # try the employees that cover the most required skills first
+    candidates.sort( key = lambda e: count_bits( employee_skills[e] & required ), reverse = True )
+
+    tried_skills = set()
+    for employee in candidates:
+        available &= ~(1 << employee)
+
+        # employees with the same relevant skills as one already tried lead to symmetrical branches
+        if employee_skills[employee] & relevant in tried_skills:
+            continue
+        tried_skills.add( employee_skills[employee] & relevant )
+
+        yield from generate_covers( task_skills, required & ~employee_skills[employee], available, chosen | (1 << employee), relevant, problem, state )
+
+
+# A cover is minimal if no employee can be removed from it without leaving some skill uncovered. Only minimal
+# covers need to be considered, since removing an employee from a cover never makes a solution worse.
+def is_minimal_cover(task_skills, chosen, problem):
+    employee_skills = problem["employee skills"]
+
+    for employee in iterate_bits(chosen):
+        others = 0
+        for other in iterate_bits( chosen & ~(1 << employee) ):
+            others |= employee_skills[other]
+
+        if task_skills & ~others == 0:
+            return False
+
+    return True
+
+
+# Compute an optimistic bound on the gain that can still be obtained from the tasks starting at the given index.
+# Every completed task needs its own employee for each of its skills, so for any skill offered by k employees at
+# most k of the tasks requiring it can be completed. Thus, only the tasks whose skills all have some capacity left
+# are considered, and the supply bound (see compute_supply_bound(...)) is applied to their remaining capacity.
+# Similarly, the number of employees left limits the tasks that can still be completed. The tightest of these
+# bounds is returned.
+#
+# @param demand - for each skill, the number of selected tasks that require it
+# @param n_selected - the minimal number of employees needed by the selected tasks
+def compute_bound(index, demand, n_selected, problem):
+    gains = problem["gains"]
+    capacity = [ problem["skill capacity"][s] - demand[s] for s in range( len(demand) ) ]
+
+    candidates = [ i for i in range( index, len(gains) ) if all( capacity[s] > 0 for s in problem["task skill list"][i] ) ]
+    total = sum( gains[i] for i in candidates )
+    bound = total
+
+    # every task needs at least as many employees as the lower bound on its cover size, so the employees left after
+    # covering the selected tasks limit the remaining tasks like a knapsack; its fractional relaxation gives a bound
+    remaining_employees = problem["n employees"] - n_selected
+    if sum( problem["min cover size"][i] for i in candidates ) > remaining_employees:
+        knapsack_bound = 0
+        for i in sorted( candidates, key = lambda i: gains[i] / problem["min cover size"][i], reverse = True ):
+            size = problem["min cover size"][i]
+            if size > remaining_employees:
+                knapsack_bound += gains[i] * remaining_employees / size
+                break
+            knapsack_bound += gains[i]
+            remaining_employees -= size
+        bound = min( bound, math.floor(knapsack_bound) )
+
+    candidates = np.array(candidates, dtype = np.int64)
+    supply_bound = compute_supply_bound( problem["gain array"][candidates], problem["task skill matrix"][candidates], np.array(capacity) )
+
+    return min( bound, int(supply_bound) )
+
+
+# Count a visited node and check if the search should be stopped because of the node or time limit.
+def visit_node(state):
+    state["nodes"] += 1
+    if state["nodes"] >= hyperparameters["node_limit"] or ( state["nodes"] % 1000 == 0 and time.time() > state["deadline"] ):
+        state["stopped"] = True
+
+    return not state["stopped"]
+
+
+# Find disjoint covers for all the given tasks using the available employees, i.e. check if the tasks can all be
+# completed at the same time. The tasks are covered starting from the most constrained one, that is the one with
+# a skill offered by the fewest available employees.
+#
+# Only the skills of the given tasks matter here, so employees offering the same of these skills are
+# interchangeable. The subproblems known to have no assignment are remembered in state["failed"].
+#
+# @param tasks - a list of task indices
+# @return a dictionary with a cover (bitset of employees) for each task, or None if there is no such assignment
+def find_assignment(tasks, available, problem, state):
+    if len(tasks) == 0:
+        return {}
+
+    key = ( frozenset(tasks), available )
+    if key in state["failed"]:
+        return None
+
+    skill_employees = problem["skill employees"]
+    task_skills = problem["task skills"]
+
+    # check the necessary conditions that there are enough employees to cover all the tasks and that no skill
+    # is required by more tasks than there are employees offering it
+    if sum( problem["min cover size"][i] for i in tasks ) > count_bits(available):
+        return None
+
+    demand = {}
+    for i in tasks:
+        for skill in problem["task skill list"][i]:
+            demand[skill] = demand.get(skill, 0) + 1
+    if any( count_bits( skill_employees[skill] & available ) < count for skill, count in demand.items() ):
+        return None
+
+    relevant = 0
+    for i in tasks:
+        relevant |= task_skills[i]
+
+    task = min( tasks, key = lambda i: min( count_bits( skill_employees[s] & available ) for s in problem["task skill list"][i] ) )
+    other_tasks = [ i for i in tasks if i != task ]
+
+    for cover in generate_covers( task_skills[task], task_skills[task], available, 0, relevant, problem, state ):
+        if not visit_node(state):
+            return None
+
+        state["assignment nodes"] += 1
+        if state["assignment nodes"] > hyperparameters["assignment_node_limit"]:
+            state["incomplete"] = True
+            return None
+
+        assignment = find_assignment( other_tasks, available & ~cover, problem, state )
+        if assignment is not None:
+            assignment[task] = cover
+            return assignment
+
+    # the search may have been interrupted, in which case nothing has been proven
+    if not state["stopped"] and state["assignment nodes"] <= hyperparameters["assignment_node_limit"]:
+        state["failed"].add(key)
+
+    return None
+
+
+# Depth-first search over the subsets of tasks, deciding for one task at a time (in the order of their heuristic
+# values) whether it is completed or not. Each node keeps an assignment of employees that completes all the selected
+# tasks. When a task is selected, it is first covered with the idle employees and only if that is not possible, the
+# assignment for all the selected tasks is searched for again. This way, the search never branches on which of the
+# many possible covers of a task is used.
+#
+# @param demand - for each skill, the number of selected tasks that require it
+# @param assignment - a dictionary with the cover (bitset of employees) of each selected task
+# @param used - the bitset of employees used in the assignment
+# @param n_selected - the minimal number of employees needed by the selected tasks
+def search(index, gain, demand, assignment, used, n_selected, problem, state):
+    if not visit_node(state):
+        return
+
+    if gain > state["best gain"]:
+        state["best gain"] = gain
+        state["best assignment"] = dict(assignment)
+
+        # the solution is within the threshold of the upper bound, so there is no need to search any further
+        if gain >= state["stop gain"]:
+            state["stopped"] = True
+            return
+
+    if index == len( problem["gains"] ):
+        return
+
+    # prune the node if even the optimistic bound cannot improve the best solution; the suffix sum is
+    # a cheaper but weaker bound, so check it first
+    if gain + problem["suffix gains"][index] <= state["best gain"]:
+        return
+    if gain + compute_bound( index, demand, n_selected, problem ) <= state["best gain"]:
+        return
+
+    task_skills = problem["task skills"][index]
+    skills = problem["task skill list"][index]
+
+    # branch 1: complete the task, provided none of its skills is used up by the selected tasks
+    if all( demand[s] < problem["skill capacity"][s] for s in skills ):
+        all_employees = ( 1 << problem["n employees"] ) - 1
+        cover = next( generate_covers( task_skills, task_skills, all_employees & ~used, 0, task_skills, problem, state ), None )
+
+        if cover is not None:
+            new_assignment = dict(assignment)
+            new_assignment[index] = cover
+            new_used = used | cover
+        else:
+            state["assignment nodes"] = 0
+            new_assignment = find_assignment( list(assignment) + [index], all_employees, problem, state )
+            new_used = sum( new_assignment.values() ) if new_assignment is not None else None
+
+        if new_assignment is not None:
+            for s in skills:
+                demand[s] += 1
+
+            search( index + 1, gain + problem["gains"][index], demand, new_assignment, new_used, n_selected + problem["min cover size"][index], problem, state )
+
+            for s in skills:
+                demand[s] -= 1
+
+    # branch 2: leave the task out
+    search( index + 1, gain, demand, assignment, used, n_selected, problem, state )
+
+
+# Exact Branch and Bound algorithm. The search is warm-started with the solution of the greedy heuristic and
+# explores the tasks in the order of the heuristic values used by the greedy heuristic. Skills and employee
+# sets are represented as bitsets, so that feasibility checks reduce to a few integer operations.
+#
+# @return ( solution, total_gain, upper_bound, optimal, nodes ) - where upper_bound is a bound on the optimal total
+#                                                                 gain, optimal says whether the search finished
+#                                                                 and nodes is the number of nodes visited
+def branch_and_bound(employees_df, tasks_df, gains):
+    deadline = time.time() + hyperparameters["time_limit"]
+
+    h_values = compute_h_values(employees_df, tasks_df, gains)
+    task_names = [ item[0] for item in sorted( h_values, key = lambda item: item[1], reverse = True ) ]
+    employee_names = list(employees_df.index)
+
+    tasks_ordered = tasks_df.loc[task_names]
+    employee_skills = encode_skills(employees_df)
+
+    problem = {
+        "gains": [ gains[task_name] for task_name in task_names ],
+        "task skills": encode_skills(tasks_ordered),
+        "employee skills": employee_skills,
+        # for each skill, the bitset of employees that offer it
+        "skill employees": [
+            sum( 1 << e for e in range( len(employee_names) ) if employee_skills[e] >> s & 1 )
+            for s in range( len(employees_df.columns) )
+        ]
+    }
+    problem["n employees"] = len(employee_names)
+    problem["skill capacity"] = [ count_bits(employees) for employees in problem["skill employees"] ]
+    problem["task skill list"] = [ list( iterate_bits(task_skills) ) for task_skills in problem["task skills"] ]
+    # the same data as numpy arrays, for the bounds shared with the other algorithms
+    problem["gain array"] = np.array( problem["gains"], dtype = np.int64 )
+    problem["task skill matrix"] = tasks_ordered.to_numpy() != 0
+    problem["min cover size"] = [
+        int(size) for size in compute_min_cover_sizes( employees_df.to_numpy() != 0, problem["task skill matrix"] )
+    ]
+    problem["suffix gains"] = [ sum( problem["gains"][i:] ) for i in range( len(task_names) + 1 ) ]
+
+    demand = [ 0 ] * len(employees_df.columns)
+    upper_bound = min( compute_bound(0, demand, 0, problem), compute_upper_bound(employees_df, tasks_df, gains) )
+
+    # warm start the search with the greedy solution; only strictly better solutions are recorded during the search
+    greedy_solution, greedy_gain = greedy_heuristic(employees_df, tasks_df, gains)
+
+    state = {
+        "nodes": 0,
+        "stopped": False,
+        "deadline": deadline,
+        "best gain": greedy_gain,
+        "stop gain": compute_stop_gain(upper_bound),
+        "best assignment": None,
+        "failed": set(),
+        "assignment nodes": 0,
+        "incomplete": False
+    }
+
+    sys.setrecursionlimit( max( sys.getrecursionlimit(), 2 * len(task_names) + 1000 ) )
+    if greedy_gain < state["stop gain"]:
+        search(0, 0, demand, {}, 0, 0, problem, state)
+    else:   # the greedy solution is already within the threshold of the bound
+        state["stopped"] = True
+
+    if state["best assignment"] is None:
+        solution, total_gain = greedy_solution, greedy_gain
+    else:
+        solution = {
+            ( employee_names[e], task_names[index] )
+            for index, cover in state["best assignment"].items()
+            for e in iterate_bits(cover)
+        }
+        total_gain = state["best gain"]
+
+    optimal = total_gain >= upper_bound or not ( state["stopped"] or state["incomplete"] )
+
+    return solution, total_gain, total_gain if optimal else upper_bound, optimal, state["nodes"]
+
+
+def branch_and_bound_solver(employees_df, tasks_df, gains):
+    start_time = time.time()
+    solution, total_gain, upper_bound, optimal, nodes = branch_and_bound(employees_df, tasks_df, gains)
+    end_time = time.time()
+
+    result = {
+        "solution": solution,
+        "total gain": total_gain,
+        "running time": end_time - start_time,
+        "upper bound": upper_bound,
+        "gap": compute_gap(total_gain, upper_bound),
+        "optimal": optimal,
+        "nodes": nodes
+    }
+
+    return result
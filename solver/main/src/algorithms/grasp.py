@@ -0,0 +1,93 @@
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from .greedyheuristic import greedy_heuristic
+from .utils import make_completion_check
+from .bounds import compute_upper_bound, compute_gap, compute_stop_gain
+
+
+hyperparameters = {
+    "n_passes": 32,     # the number of randomised greedy passes
+    "rcl_size": 3,      # the size of the restricted candidate list of tasks
+    "seed": 0,          # the seed of the first pass; pass i is seeded with seed + i
+    "n_workers": None   # the number of worker processes, None means one per CPU core
+}
+
+
+# The problem instance is sent to each worker process only once, when the worker is started,
+# and is kept in this dictionary for all the passes run by the worker.
+worker_instance = {}
+
+
+def init_worker(employees_df, tasks_df, gains):
+    worker_instance["employees_df"] = employees_df
+    worker_instance["tasks_df"] = tasks_df
+    worker_instance["gains"] = gains
+
+    # the passes run by a worker share a single completion cache
+    worker_instance["completion_check"] = make_completion_check(employees_df, tasks_df)
+
+
+# Run a single randomised greedy pass in a worker process.
+#
+# @return ( solution, total_gain ) - the solution found by the pass and its total gain
+def grasp_pass(seed):
+    return greedy_heuristic(
+        worker_instance["employees_df"],
+        worker_instance["tasks_df"],
+        worker_instance["gains"],
+        completion_check = worker_instance["completion_check"],
+        rcl_size = hyperparameters["rcl_size"],
+        random_state = np.random.RandomState(seed)
+    )
+
+
+# Greedy Randomised Adaptive Search Procedure (GRASP). The greedy heuristic is run a number of times, each
+# time with a different seed, so that both the choice of the next task (from the restricted candidate list)
+# and the tie-breaking between equally good employees differ between the passes. The passes are distributed
+# across a pool of processes and the best solution found is returned.
+#
+# @param stop_gain - (optional) once a pass finds a solution with at least this total gain, the passes that
+#                    have not started yet are cancelled
+# @return ( solution, total_gain, seed, gains ) - the best solution, its total gain, the seed of the pass
+#                                                that found it and the gains of all finished passes (in seed order)
+def grasp(employees_df, tasks_df, gains, stop_gain = None):
+    seeds = range( hyperparameters["seed"], hyperparameters["seed"] + hyperparameters["n_passes"] )
+    n_workers = hyperparameters["n_workers"] or os.cpu_count()
+
+    results = {}
+    with ProcessPoolExecutor( max_workers = n_workers, initializer = init_worker, initargs = (employees_df, tasks_df, gains) ) as executor:
+        futures = { executor.submit(grasp_pass, seed): seed for seed in seeds }
+
+        for future in as_completed(futures):
+            results[ futures[future] ] = future.result()
+
+            if stop_gain is not None and results[ futures[future] ][1] >= stop_gain:
+                for pending in futures:
+                    pending.cancel()
+                break
+
+    best_seed = max( sorted(results), key = lambda seed: results[seed][1] )
+    best_solution, best_gain = results[best_seed]
+
+    return best_solution, best_gain, best_seed, [ results[seed][1] for seed in sorted(results) ]
+
+
+def grasp_solver(employees_df, tasks_df, gains):
+    start_time = time.time()
+    upper_bound = compute_upper_bound(employees_df, tasks_df, gains)
+    solution, total_gain, seed, gain_distribution = grasp(employees_df, tasks_df, gains, compute_stop_gain(upper_bound))
+    end_time = time.time()
+
+    result = {
+        "solution": solution,
+        "total gain": total_gain,
+        "running time": end_time - start_time,
+        "upper bound": upper_bound,
+        "gap": compute_gap(total_gain, upper_bound),
+        "best seed": seed,
+        "gain distribution": gain_distribution
+    }
+
+    return result
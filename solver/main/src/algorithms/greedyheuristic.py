@@ -1,6 +1,7 @@
 import time
 import numpy as np
-from .utils import get_assignable, is_completed_by
+from .utils import get_assignable, is_completed_by, check_completed
+from .bounds import compute_upper_bound, compute_gap
 
 
 def compute_supply_demand_ratio(employees_df, tasks_df):
@@ -39,10 +40,12 @@ def compute_h_values(employees_df, tasks_df, gains):
     return h_values
 
 
+# @param random_state - (optional) a numpy RandomState used to break ties between equally good employees;
+#                       if not given, numpy's global random generator is used
 # @return ( next_employee_name, assignable ) - where next_employee_name is the name of the employee
 #                                              chosen to be assigned to the task, and assignable is an
 #                                              updated dataframe
-def get_next_employee(assignable):
+def get_next_employee(assignable, random_state = None):
 
     # get the names of the skills offered by the least number of employees;
     # these are the most-constraining variables as they are the hardest to satisfy
@@ -64,7 +67,7 @@ def get_next_employee(assignable):
 
     # choose a random employee from those above and get the name of that employee;
     # this is the employee that is chosen for assignment
-    next_employee_name = best_employees.sample( n = 1 ).index[0]
+    next_employee_name = best_employees.sample( n = 1, random_state = random_state ).index[0]
     next_employee = assignable.loc[ next_employee_name ]
 
     # remove the skills of that employee from the dataframe
@@ -76,7 +79,13 @@ def get_next_employee(assignable):
     return next_employee_name, assignable
 
 
-def greedy_heuristic(employees_df, tasks_df, gains):
+# @param completion_check - (optional) a memoised completion check created with make_completion_check(...),
+#                           useful when the heuristic is run repeatedly on the same problem instance
+# @param rcl_size - the size of the restricted candidate list; the next task is chosen at random from the
+#                   rcl_size remaining tasks with the highest heuristic values (1 means always the best one)
+# @param random_state - (optional) a numpy RandomState used for all random choices; if not given,
+#                       numpy's global random generator is used
+def greedy_heuristic(employees_df, tasks_df, gains, completion_check = None, rcl_size = 1, random_state = None):
     # compute heuristic values for all tasks
     h_values = compute_h_values(employees_df, tasks_df, gains)
 
@@ -87,8 +96,13 @@ def greedy_heuristic(employees_df, tasks_df, gains):
     solution = set()
     total_gain = 0
     while len(tasks_sorted) > 0:
-        # remove the first item from the list of sorted (task, h_value) pairs and get the task name
-        task_name = tasks_sorted.pop(0)[0]
+        # remove an item from the restricted candidate list, i.e. from the first rcl_size items of
+        # the list of sorted (task, h_value) pairs, and get the task name
+        candidate_index = 0
+        if rcl_size > 1:
+            candidate_index = ( np.random if random_state is None else random_state ).randint( min(rcl_size, len(tasks_sorted)) )
+
+        task_name = tasks_sorted.pop(candidate_index)[0]
         task = tasks_df.loc[ task_name ]
 
         # get the subset of employees assignable to the task;
@@ -107,12 +121,12 @@ def greedy_heuristic(employees_df, tasks_df, gains):
         assignment = set()
         while ( not assignable.empty ) and ( task_name not in completed ):
             # get the next employee to assign to the task and an updated table of assignable employees
-            e_next, assignable = get_next_employee(assignable)
+            e_next, assignable = get_next_employee(assignable, random_state)
             # print(task_name + " - " + e_next)
             employees_used.add(e_next)
             assignment.add( (e_next, task_name) )
 
-            if is_completed_by( task, employees_df.loc[ employees_used ] ):
+            if check_completed( task_name, employees_used, employees_df, tasks_df, completion_check ):
                 completed.add(task_name)
 
         if task_name in completed:
@@ -125,13 +139,16 @@ def greedy_heuristic(employees_df, tasks_df, gains):
 
 def greedy_heuristic_solver(employees_df, tasks_df, gains):
     start_time = time.time()
+    upper_bound = compute_upper_bound(employees_df, tasks_df, gains)
     solution, total_gain = greedy_heuristic(employees_df, tasks_df, gains)
     end_time = time.time()
 
     result = {
         "solution": solution,
         "total gain": total_gain,
-        "running time": end_time - start_time
+        "running time": end_time - start_time,
+        "upper bound": upper_bound,
+        "gap": compute_gap(total_gain, upper_bound)
     }
 
     return result
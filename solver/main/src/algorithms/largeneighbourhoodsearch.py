@@ -0,0 +1,159 @@
+import time
+import math
+import numpy as np
+from .greedyheuristic import greedy_heuristic
+from .utils import make_completion_check
+from .bounds import compute_upper_bound, compute_gap, compute_stop_gain
+
+
+hyperparameters = {
+    "destroy_size": 4,                      # the number of tasks released in each iteration
+    "related_probability": 0.5,             # the probability of releasing tasks with related skills rather than random ones
+    "initial_probability_threshold": 0.95,
+    "alpha": 0.99,                          # rate of change for temperature, applied after every iteration
+    "min_temp": 1,                          # termination criterion, we stop the search when the temperature gets below this value
+    "max_iterations": 2000,                 # termination criterion, the maximal number of destroy and repair iterations
+    "max_stagnation": 250,                  # termination criterion, the maximal number of iterations without improving the best solution
+    "seed": None                            # seed of the random generator, None means unseeded
+}
+
+
+# Choose the tasks to be released (destroyed). With probability "related_probability" a random task is chosen
+# together with the tasks that share the most skills with it, since regrouping the employees of such tasks is the
+# most likely to complete one of them; otherwise, the tasks are chosen uniformly at random.
+#
+# @param task_skills - a numpy matrix with the skill encodings of the tasks (one row per task)
+# @return an array of row indices of the chosen tasks
+def choose_destroyed(task_skills, random_state):
+    n_tasks = task_skills.shape[0]
+    destroy_size = min( hyperparameters["destroy_size"], n_tasks )
+
+    if random_state.random_sample() >= hyperparameters["related_probability"]:
+        return random_state.choice( n_tasks, size = destroy_size, replace = False )
+
+    seed_task = random_state.randint(n_tasks)
+
+    # count the skills shared with the seed task (the seed task itself shares the most) and break ties randomly
+    relatedness = task_skills @ task_skills[seed_task] + random_state.random_sample(n_tasks)
+
+    return np.argpartition( -relatedness, destroy_size - 1 )[0 : destroy_size]
+
+
+# Compute the initial temperature such that the probability of accepting any rebuild is at or above the
+# "initial_probability_threshold". The worst possible rebuild loses all of the destroyed tasks, so the
+# maximal difference of cost is the sum of the "destroy_size" tasks with the highest gain values.
+def compute_initial_temp(gains):
+    gains_sorted = sorted( gains.values(), reverse = True )
+
+    max_difference = sum( gains_sorted[ 0 : hyperparameters["destroy_size"] ] )
+
+    return -1 * max_difference / math.log( hyperparameters["initial_probability_threshold"] )
+
+
+# Large Neighbourhood Search (LNS). The initial solution is found with the greedy heuristic. Then, in each iteration,
+# a few tasks are released together with the employees assigned to them and rebuilt with the greedy heuristic, using
+# the released employees and the employees that are not assigned to any task. The rebuild is accepted using the same
+# criterion as in Simulated Annealing.
+#
+# Each iteration only touches the destroyed region, i.e. the released tasks and the employees that could be assigned
+# to them, so the cost of an iteration does not grow with the size of the solution.
+#
+# @param stop_cost - (optional) the search is stopped as soon as a solution with at least this cost is found
+# @return ( solution, total_gain ) - the best solution found and its total gain
+def large_neighbourhood_search(employees_df, tasks_df, gains, completion_check = None, stop_cost = None):
+    random_state = np.random.RandomState( hyperparameters["seed"] )
+
+    task_names = tasks_df.index
+    task_skills = ( tasks_df.to_numpy() != 0 ).astype(int)
+    employee_skills = ( employees_df.to_numpy() != 0 ).astype(int)
+
+    # for each task, the names of the employees that can be assigned to it, i.e. that offer at least one of its skills
+    assignable_matrix = ( task_skills @ employee_skills.T ) > 0
+    assignable = { task_names[i]: set( employees_df.index[ assignable_matrix[i] ] ) for i in range( len(task_names) ) }
+
+    # the current solution is kept as the employees assigned to each completed task
+    # and, for quick lookups, the task that each assigned employee works on
+    solution, current_cost = greedy_heuristic(employees_df, tasks_df, gains, completion_check, random_state = random_state)
+    assignment = {}
+    employee_task = {}
+    for employee_name, task_name in solution:
+        assignment.setdefault( task_name, set() ).add(employee_name)
+        employee_task[employee_name] = task_name
+
+    best_solution = set(solution)
+    best_cost = current_cost
+
+    temp = compute_initial_temp(gains)
+    iteration = 0
+    last_improvement = 0
+    while temp >= hyperparameters["min_temp"] and iteration < hyperparameters["max_iterations"] \
+            and iteration - last_improvement < hyperparameters["max_stagnation"] \
+            and ( stop_cost is None or best_cost < stop_cost ):
+        iteration += 1
+        temp = temp * hyperparameters["alpha"]
+
+        # destroy: release the chosen tasks together with their employees
+        destroyed = set( task_names[ choose_destroyed(task_skills, random_state) ] )
+        released_cost = sum( gains[task_name] for task_name in destroyed if task_name in assignment )
+
+        # the employees available for the rebuild are those assignable to the destroyed tasks
+        # that are either released or not assigned to any task at all
+        available = set()
+        for task_name in destroyed:
+            available.update( e for e in assignable[task_name] if employee_task.get(e, task_name) in destroyed )
+
+        if len(available) == 0:
+            continue
+
+        # repair: rebuild the destroyed tasks with the greedy heuristic
+        rebuild, rebuild_cost = greedy_heuristic(
+            employees_df.loc[ sorted(available) ],
+            tasks_df.loc[ sorted(destroyed) ],
+            { task_name: gains[task_name] for task_name in destroyed },
+            completion_check,
+            random_state = random_state
+        )
+
+        cost_difference = rebuild_cost - released_cost
+
+        # accept the rebuild if it is not worse (remember, higher cost is better), otherwise accept with certain probability
+        if cost_difference < 0 and math.exp( cost_difference / temp ) < random_state.random_sample():
+            continue
+
+        for task_name in destroyed:
+            for employee_name in assignment.pop( task_name, set() ):
+                del employee_task[employee_name]
+
+        for employee_name, task_name in rebuild:
+            assignment.setdefault( task_name, set() ).add(employee_name)
+            employee_task[employee_name] = task_name
+
+        current_cost += cost_difference
+
+        if current_cost > best_cost:    # if the best config yet, update the best
+            best_solution = { (employee_name, task_name) for employee_name, task_name in employee_task.items() }
+            best_cost = current_cost
+            last_improvement = iteration
+
+    return best_solution, best_cost
+
+
+def large_neighbourhood_search_solver(employees_df, tasks_df, gains):
+    start_time = time.time()
+    completion_check = make_completion_check(employees_df, tasks_df)
+    upper_bound = compute_upper_bound(employees_df, tasks_df, gains)
+    solution, total_gain = large_neighbourhood_search(employees_df, tasks_df, gains, completion_check, compute_stop_gain(upper_bound))
+    end_time = time.time()
+
+    cache_info = completion_check.cache_info()
+
+    result = {
+        "solution": solution,
+        "total gain": total_gain,
+        "running time": end_time - start_time,
+        "upper bound": upper_bound,
+        "gap": compute_gap(total_gain, upper_bound),
+        "completion cache": { "hits": cache_info.hits, "misses": cache_info.misses }
+    }
+
+    return result
@@ -0,0 +1,155 @@
+import os
+import time
+import traceback
+import queue
+import signal
+import multiprocessing
+from utils import certify_solution
+from .bounds import compute_upper_bound, compute_gap, compute_stop_gain
+
+
+hyperparameters = {
+    "time_budget": 60   # wall-clock budget shared by all the algorithms in the portfolio, in seconds
+}
+
+
+# Run a single algorithm of the portfolio in a separate process and send its result back to the
+# parent process. If the algorithm fails, None is sent in place of the result, together with the traceback.
+def run_algorithm(algorithm_code, employees_df, tasks_df, gains, results_queue):
+    from .algorithms import algorithms
+
+    # put the process in its own process group so that it can be terminated together with
+    # any processes it starts itself (e.g. the worker pool of the GRASP algorithm)
+    if hasattr(os, "setsid"):
+        os.setsid()
+
+    try:
+        result = algorithms[algorithm_code]["algorithm"](employees_df, tasks_df, gains)
+        error = None
+    except Exception:
+        result = None
+        error = traceback.format_exc()
+
+    results_queue.put( (algorithm_code, result, error) )
+
+
+# Terminate the process of an algorithm together with all the processes it started.
+def terminate(process):
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+            return
+        except OSError:     # the process group does not exist (yet), fall back to terminating the process only
+            pass
+
+    process.terminate()
+
+
+# Run all the registered algorithms concurrently, each in its own process, under a shared wall-clock budget.
+# The search stops when the budget expires, when all the algorithms have finished or when one of them has
+# found a solution whose gap to the upper bound is within the threshold. The algorithms that are still
+# running are then terminated, also if the collection is interrupted (e.g. by Ctrl-C): the algorithms run in
+# their own process groups, so they would not receive the interrupt themselves.
+#
+# The results are certified as they arrive, so that an algorithm cannot win with an invalid solution or with
+# a total gain that does not match its solution.
+#
+# @return ( best_result, winner, time_to_best, terminated, failed, upper_bound ) - where best_result is the result of
+#         the algorithm that found the best valid solution (None if no algorithm finished in time), winner is the code
+#         of that algorithm, time_to_best is the time (in seconds) after which its result was received, terminated
+#         is the list of codes of the algorithms that were terminated, failed is a dictionary mapping the codes of the
+#         algorithms that failed (raised an exception or returned a solution that failed certification) to the reason
+#         and upper_bound is the tightest bound known
+def portfolio(employees_df, tasks_df, gains, upper_bound):
+    from .algorithms import algorithms
+
+    algorithm_codes = [ code for code, entry in algorithms.items() if entry["algorithm"] is not portfolio_solver ]
+    stop_gain = compute_stop_gain(upper_bound)
+
+    results_queue = multiprocessing.Queue()
+    processes = {
+        code: multiprocessing.Process( target = run_algorithm, args = (code, employees_df, tasks_df, gains, results_queue) )
+        for code in algorithm_codes
+    }
+
+    best_result = None
+    winner = None
+    time_to_best = None
+    failed = {}
+    pending = set(algorithm_codes)
+
+    start_time = time.time()
+    try:
+        for process in processes.values():
+            process.start()
+
+        while len(pending) > 0:
+            remaining_time = hyperparameters["time_budget"] - ( time.time() - start_time )
+            if remaining_time <= 0:
+                break
+
+            try:
+                code, result, error = results_queue.get( timeout = remaining_time )
+            except queue.Empty:     # the budget expired while waiting for the results
+                break
+
+            pending.discard(code)
+
+            if result is None:
+                failed[code] = error
+                continue
+
+            # the net profit is not needed here, hence no tasks are passed to the certifier
+            certificate = certify_solution( result["solution"], result["total gain"], employees_df, tasks_df, gains, [] )
+            if not certificate["valid"]:
+                failed[code] = "Solution failed certification:\n\t" + "\n\t".join( certificate["discrepancies"] )
+                continue
+
+            if best_result is None or result["total gain"] > best_result["total gain"]:
+                best_result = result
+                winner = code
+                time_to_best = time.time() - start_time
+
+            # some algorithms (e.g. the exact ones) report a tighter bound of their own
+            if result.get("upper bound", upper_bound) < upper_bound:
+                upper_bound = result["upper bound"]
+                stop_gain = compute_stop_gain(upper_bound)
+
+            # the solution is within the threshold of the bound, so there is no point in waiting for the rest
+            if best_result["total gain"] >= stop_gain:
+                break
+
+    finally:
+        # terminate the losers, i.e. the algorithms that did not finish in time (or all of them if interrupted)
+        for process in processes.values():
+            if process.pid is not None and process.is_alive():
+                terminate(process)
+
+        for process in processes.values():
+            if process.pid is not None:
+                process.join()
+
+    return best_result, winner, time_to_best, sorted(pending), failed, upper_bound
+
+
+def portfolio_solver(employees_df, tasks_df, gains):
+    start_time = time.time()
+    upper_bound = compute_upper_bound(employees_df, tasks_df, gains)
+    best_result, winner, time_to_best, terminated, failed, upper_bound = portfolio(employees_df, tasks_df, gains, upper_bound)
+    end_time = time.time()
+
+    total_gain = 0 if best_result is None else best_result["total gain"]
+
+    result = {
+        "solution": set() if best_result is None else best_result["solution"],
+        "total gain": total_gain,
+        "running time": end_time - start_time,
+        "upper bound": upper_bound,
+        "gap": compute_gap(total_gain, upper_bound),
+        "winner": winner,
+        "time to solution": time_to_best,
+        "terminated": terminated,
+        "failed": failed
+    }
+
+    return result
@@ -1,24 +1,38 @@
+import os
+import gzip
 import time
 import math
+import pickle
 import random
-from .utils import get_assignable, is_completed_by
+import hashlib
+import numpy as np
+import pandas as pd
+from .utils import get_assignable, check_completed, make_completion_check
+from .bounds import compute_upper_bound, compute_gap, compute_stop_gain
 
 
 hyperparameters = {
     "n_change_parameter": 2,
     "initial_probability_threshold": 0.95,
-    "alpha": 0.75,   # rate of change for temperature, should be within range (0.8, 0.99)
+    "alpha": 0.75,   # rate of change for temperature, should be within range (0, 1); values closer to 1 cool more slowly (see tune.py)
     "beta": 1.05,    # rate of change for phase length, should be > 1
     "min_temp": 5,   # termination criterion, we stop the search when the temperature gets below this value
-    "initial_phase_length": 10
+    "initial_phase_length": 10,
+    "completion_cache_size": 65536, # maximal number of (task, employee group) completion checks kept in the cache
+    "checkpoint_path": None,        # file to which the state of the search is periodically saved, None means no checkpoints
+    "checkpoint_interval": 600,     # the minimal time between two checkpoints, in seconds
+    "resume": False                 # if True and the checkpoint file exists, the search continues from the checkpoint
 }
 
+# the hyperparameters that do not affect the course of the search, i.e. that can differ when resuming from a checkpoint
+checkpoint_hyperparameters = { "completion_cache_size", "checkpoint_path", "checkpoint_interval", "resume" }
+
 
 # def greedy_heuristic_init(employees_df, tasks_df, gains):
 #     pass
 
 
-def compute_cost(config, employees_df, tasks_df, gains):
+def compute_cost(config, employees_df, tasks_df, gains, completion_check = None):
     # get the set of tasks present in the configuration
     assigned_tasks = { item[1] for item in config }
 
@@ -29,7 +43,7 @@ def compute_cost(config, employees_df, tasks_df, gains):
         # get employees assigned to the task
         assigned_employees = { item[0] for item in config if item[1] == task_name }
 
-        if is_completed_by( tasks_df.loc[task_name], employees_df.loc[assigned_employees] ):
+        if check_completed( task_name, assigned_employees, employees_df, tasks_df, completion_check ):
             cost += gains[task_name]
 
     return cost
@@ -75,7 +89,7 @@ def n_change(employees_df, tasks_df, n = 1):
     return additions
 
 
-def compute_cost_difference(old_config, additions, deletions, employees_df, tasks_df, gains):
+def compute_cost_difference(old_config, additions, deletions, employees_df, tasks_df, gains, completion_check = None):
     # get the tasks that are updated as a result of the change
     tasks_updated = { item[1] for item in additions }.union({ item[1] for item in deletions })
 
@@ -95,8 +109,8 @@ def compute_cost_difference(old_config, additions, deletions, employees_df, task
         new_task_assignment = old_task_assignment.union(employee_additions).difference(employee_deletions)
 
         # decide whether the task was completed in the old and new solutions
-        was_completed = is_completed_by( tasks_df.loc[task_name], employees_df.loc[old_task_assignment] )
-        is_completed = is_completed_by( tasks_df.loc[task_name], employees_df.loc[new_task_assignment] )
+        was_completed = check_completed( task_name, old_task_assignment, employees_df, tasks_df, completion_check )
+        is_completed = check_completed( task_name, new_task_assignment, employees_df, tasks_df, completion_check )
 
         if was_completed and not is_completed:
             cost_difference -= gains[task_name]
@@ -106,7 +120,7 @@ def compute_cost_difference(old_config, additions, deletions, employees_df, task
     return cost_difference
 
 
-def generate_neighbour(current_config, current_cost, employees_df, tasks_df, gains):
+def generate_neighbour(current_config, current_cost, employees_df, tasks_df, gains, completion_check = None):
     additions = n_change(employees_df, tasks_df, hyperparameters["n_change_parameter"])
     employees_to_update = { item[0] for item in additions }
     deletions = { item for item in current_config if item[0] in employees_to_update }
@@ -118,7 +132,7 @@ def generate_neighbour(current_config, current_cost, employees_df, tasks_df, gai
     deletions = deletions.difference(intersection)
 
     # compute the cost of the new solution based on the old solution and the updates
-    new_cost = current_cost + compute_cost_difference(current_config, additions, deletions, employees_df, tasks_df, gains)
+    new_cost = current_cost + compute_cost_difference(current_config, additions, deletions, employees_df, tasks_df, gains, completion_check)
 
     # generate the new solution
     new_config = current_config.union(additions).difference(deletions)
@@ -156,19 +170,121 @@ def update_phase_length(phase_length):
 #     pass
 
 
-def simulated_annealing(employees_df, tasks_df, gains, initialisation = random_init):
-    # compute the initial solution/configuration and its cost using the specified function
-    current_config, current_cost = initialisation(employees_df, tasks_df, gains)
-    best_config = current_config
-    best_cost = current_cost
+# Compute a fingerprint of the problem instance, used to check that a checkpoint belongs to the instance being solved.
+# Note, the order of the skill columns differs between runs (the skills are collected in a set during preprocessing),
+# so the columns are sorted first.
+def compute_instance_fingerprint(employees_df, tasks_df, gains):
+    employees_df = employees_df.sort_index(axis = 1)
+    tasks_df = tasks_df.sort_index(axis = 1)
+
+    fingerprint = hashlib.sha256()
+    fingerprint.update( pd.util.hash_pandas_object(employees_df).to_numpy().tobytes() )
+    fingerprint.update( pd.util.hash_pandas_object(tasks_df).to_numpy().tobytes() )
+    fingerprint.update( repr( list(employees_df.columns) + list(tasks_df.columns) ).encode() )
+    fingerprint.update( repr( sorted( gains.items() ) ).encode() )
+
+    return fingerprint.hexdigest()
+
+
+# Save the state of the search to the checkpoint file. The state is first written to a temporary file which then
+# replaces the checkpoint, so that the checkpoint is never left half-written if the process is killed.
+def save_checkpoint(path, search_state):
+    temp_path = path + ".tmp"
+    with gzip.open(temp_path, "wb") as file:
+        pickle.dump(search_state, file, protocol = pickle.HIGHEST_PROTOCOL)
+
+    os.replace(temp_path, path)
+
+
+def load_checkpoint(path, instance_fingerprint):
+    with gzip.open(path, "rb") as file:
+        search_state = pickle.load(file)
+
+    if search_state["instance"] != instance_fingerprint:
+        raise Exception("Simulated Annealing Error: the checkpoint was created for a different problem instance")
 
-    phase_length = hyperparameters["initial_phase_length"]
-    temp = compute_initial_temp(gains)
+    if search_state["hyperparameters"] != get_search_hyperparameters():
+        raise Exception("Simulated Annealing Error: the checkpoint was created with different hyperparameters")
 
-    finished = False
+    return search_state
+
+
+def get_search_hyperparameters():
+    return { name: value for name, value in hyperparameters.items() if name not in checkpoint_hyperparameters }
+
+
+# @param completion_check - (optional) a memoised completion check created with make_completion_check(...);
+#                           the same (task, employee group) pairs are evaluated over and over during the
+#                           search, so caching the results saves a lot of work, especially in the late phases
+# @param stop_cost - (optional) the search is stopped as soon as a configuration with at least this cost is found
+# @param time_limit - (optional) the search is stopped after this many seconds
+# @param checkpoint_path - (optional) file to which the full state of the search (including the states of the random
+#                          generators) is saved every "checkpoint_interval" seconds
+# @param resume - if True and the checkpoint file exists, the search continues exactly where the checkpoint left off;
+#                 the checkpoint file is deleted once the search finishes, unless it is stopped by the time limit
+def simulated_annealing(employees_df, tasks_df, gains, initialisation = random_init, completion_check = None, stop_cost = None, time_limit = None,
+                        checkpoint_path = None, resume = False):
+    start_time = time.time()
+    last_checkpoint_time = start_time
+
+    if checkpoint_path is not None:
+        instance_fingerprint = compute_instance_fingerprint(employees_df, tasks_df, gains)
+
+    if checkpoint_path is not None and resume and os.path.exists(checkpoint_path):
+        search_state = load_checkpoint(checkpoint_path, instance_fingerprint)
+
+        current_config = set( search_state["current config"] )
+        current_cost = search_state["current cost"]
+        best_config = set( search_state["best config"] )
+        best_cost = search_state["best cost"]
+        temp = search_state["temp"]
+        phase_length = search_state["phase length"]
+        phase = search_state["phase"]
+        iteration = search_state["iteration"]
+        random.setstate( search_state["random state"] )
+        np.random.set_state( search_state["numpy random state"] )
+        start_time -= search_state["running time"]
+    else:
+        # compute the initial solution/configuration and its cost using the specified function
+        current_config, current_cost = initialisation(employees_df, tasks_df, gains)
+        best_config = current_config
+        best_cost = current_cost
+
+        phase_length = hyperparameters["initial_phase_length"]
+        temp = compute_initial_temp(gains)
+        phase = 0
+        iteration = 0
+
+    finished = stop_cost is not None and best_cost >= stop_cost
+    timed_out = False
     while not finished:
-        for i in range(phase_length):
-            new_config, new_cost = generate_neighbour(current_config, current_cost, employees_df, tasks_df, gains)
+        while iteration < phase_length:
+            if time_limit is not None and time.time() - start_time >= time_limit:
+                finished = True
+                timed_out = True
+                break
+
+            if checkpoint_path is not None and time.time() - last_checkpoint_time >= hyperparameters["checkpoint_interval"]:
+                save_checkpoint(checkpoint_path, {
+                    "instance": instance_fingerprint,
+                    "hyperparameters": get_search_hyperparameters(),
+                    "current config": list(current_config),
+                    "current cost": current_cost,
+                    "best config": list(best_config),
+                    "best cost": best_cost,
+                    "temp": temp,
+                    "phase length": phase_length,
+                    "phase": phase,
+                    "iteration": iteration,
+                    "random state": random.getstate(),
+                    "numpy random state": np.random.get_state(),
+                    "running time": time.time() - start_time
+                })
+                last_checkpoint_time = time.time()
+
+            iteration += 1
+
+            new_config, new_cost = generate_neighbour(current_config, current_cost, employees_df, tasks_df, gains, completion_check)
 
             if new_cost > current_cost: # remember, higher cost is better
                 # accept the new configuration, i.e. move to this solution
@@ -177,6 +293,10 @@ def simulated_annealing(employees_df, tasks_df, gains, initialisation = random_i
                 if new_cost > best_cost:    # if also the best config yet, update the best
                     best_config = new_config
                     best_cost = new_cost
+
+                    if stop_cost is not None and best_cost >= stop_cost:  # good enough, no need to search any further
+                        finished = True
+                        break
             # else (if new config is worse than current config), accept with certain probability
             elif math.exp( (new_cost - current_cost) / temp ) >= random.random():
                 current_config = new_config
@@ -184,23 +304,44 @@ def simulated_annealing(employees_df, tasks_df, gains, initialisation = random_i
 
         phase_length = update_phase_length(phase_length)
         temp = update_temp(temp)
+        phase += 1
+        iteration = 0
 
         if temp < hyperparameters["min_temp"]:  # stopping criterion for the search
             finished = True
 
+    # the search is over, so a later run resuming from the checkpoint must start afresh instead of replaying its end
+    if checkpoint_path is not None and not timed_out and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
     return best_config, best_cost
 
 
-def simulated_annealing_with_random(employees_df, tasks_df, gains):
+# @param checkpoint_path - (optional) overrides hyperparameters["checkpoint_path"]
+# @param resume - (optional) overrides hyperparameters["resume"]
+def simulated_annealing_with_random(employees_df, tasks_df, gains, checkpoint_path = None, resume = None):
     start_time = time.time()
+    completion_check = make_completion_check( employees_df, tasks_df, hyperparameters["completion_cache_size"] )
+    upper_bound = compute_upper_bound(employees_df, tasks_df, gains)
     # perform Simulated Annealing with random initialisation
-    solution, total_gain = simulated_annealing(employees_df, tasks_df, gains)
+    solution, total_gain = simulated_annealing(
+        employees_df, tasks_df, gains,
+        completion_check = completion_check,
+        stop_cost = compute_stop_gain(upper_bound),
+        checkpoint_path = checkpoint_path if checkpoint_path is not None else hyperparameters["checkpoint_path"],
+        resume = resume if resume is not None else hyperparameters["resume"]
+    )
     end_time = time.time()
 
+    cache_info = completion_check.cache_info()
+
     result = {
         "solution": solution,
         "total gain": total_gain,
-        "running time": end_time - start_time
+        "running time": end_time - start_time,
+        "upper bound": upper_bound,
+        "gap": compute_gap(total_gain, upper_bound),
+        "completion cache": { "hits": cache_info.hits, "misses": cache_info.misses }
     }
 
     return result
@@ -1,3 +1,4 @@
+import functools
 import numpy as np
 
 # Get the employees that can be assigned to a task, or the tasks that an employee can be assigned to.
@@ -5,18 +6,13 @@ import numpy as np
 #
 # @return entities_df with unassignable entities filtered out
 def get_assignable(entity, entities_df):
-    # the mask performs a logical AND on the skill encodings of an item (from entities_df) and the given entity;
+    # perform a logical AND on the skill encodings of all items (from entities_df) and the given entity at once;
     # as a result, only the skills that both appear in the entity as well as in the item
     # are given the value of 1 in the resulting row; the rest are set to 0
-    mask = lambda item: np.logical_and(item, entity)
-
-    # apply the above mask to all entities
-    entities_filtered = entities_df.apply( mask, axis = 1 ).astype(int)
+    entities_filtered = np.logical_and( entities_df.to_numpy(), entity[ entities_df.columns ].to_numpy() )
 
     # remove unassignable entities, i.e. remove rows with all zeros
-    assignable = entities_filtered[ entities_filtered.any(axis = 1) ]
-
-    return entities_df.loc[ assignable.index ]
+    return entities_df[ entities_filtered.any(axis = 1) ]
 
 
 def is_completed_by(task, employees):
@@ -32,3 +28,29 @@ def is_completed_by(task, employees):
         return True
     else:
         return False
+
+
+# Create a memoised version of is_completed_by(...) for the given problem instance. The returned function
+# takes a task name and a frozenset of employee names (the canonical encoding of the group assigned to the
+# task) and checks if the task is completed by the group. The results are kept in a bounded LRU cache;
+# the number of hits and misses can be read with the function's cache_info() method.
+#
+# Note, the result for a (task, group) pair only depends on the skills of the task and of the employees
+# in the group, so the cache stays correct even if employees are later removed from employees_df.
+#
+# @return completion_check(task_name, group) - the memoised completion check
+def make_completion_check(employees_df, tasks_df, maxsize = 65536):
+    @functools.lru_cache(maxsize = maxsize)
+    def completion_check(task_name, group):
+        return is_completed_by( tasks_df.loc[task_name], employees_df.loc[ list(group) ] )
+
+    return completion_check
+
+
+# Check if the task is completed by the given employees. If a completion check created with
+# make_completion_check(...) is supplied, the cached result is used whenever possible.
+def check_completed(task_name, employee_names, employees_df, tasks_df, completion_check = None):
+    if completion_check is None:
+        return is_completed_by( tasks_df.loc[task_name], employees_df.loc[ list(employee_names) ] )
+
+    return completion_check( task_name, frozenset(employee_names) )
@@ -5,7 +5,10 @@ import utils
 import algorithms
 
 def get_help():
-    help_text = "Usage: python3 main.py  <algorithm_code>  <employees_file>  <tasks_file>  [solution_file]\n\n"
+    help_text = "Usage: python3 main.py  <algorithm_code>  <employees_file>  <tasks_file>  [solution_file]  [--checkpoint <checkpoint_file>]  [--resume]\n\n"
+    help_text += "Options (only for the algorithms that support checkpointing):\n"
+    help_text += "\t--checkpoint <checkpoint_file> - periodically save the state of the search to the file\n"
+    help_text += "\t--resume - continue the search from the checkpoint file if it exists\n\n"
     help_text += "Available algorithms:\n"
 
     for algorithm_code, algorithm in algorithms.algorithms.items():
@@ -46,8 +49,25 @@ def parse_args(argv):
     }
 
     # parse optional arguments if provided
-    if len(argv) == 5:
-        params["solution_path"] = argv[4]
+    optional = argv[4:]
+    while len(optional) > 0:
+        arg = optional.pop(0)
+        if arg == "--checkpoint":
+            if len(optional) == 0:
+                raise Exception("Checkpoint file missing\n" + get_help())
+            params["checkpoint_path"] = optional.pop(0)
+        elif arg == "--resume":
+            params["resume"] = True
+        elif arg.startswith("--") or "solution_path" in params:
+            raise Exception("Incorrect parameter " + arg + "\n" + get_help())
+        else:
+            params["solution_path"] = arg
+
+    if "resume" in params and "checkpoint_path" not in params:
+        raise Exception("--resume requires --checkpoint\n" + get_help())
+
+    if "checkpoint_path" in params and not algorithms.algorithms[algo].get("checkpointing", False):
+        raise Exception("The chosen algorithm does not support checkpointing\n" + get_help())
 
     return params
 
@@ -74,7 +94,7 @@ def main():
     #   ( i.e. create appropriate data structs for algorithms,
     #   remove tasks and employees that cannot be matched with anyone )
     # 8. call chosen algorithm with parsed files as args    <- DONE
-    # 9. validate the solution  <- DONE
+    # 9. validate and certify the solution  <- DONE
     # 10. compute the net profit
     # 11. (optional) save solution to a file
     try:
@@ -116,7 +136,14 @@ def main():
 
         # solve the problem instance
         print("\nRunning " + algorithms.algorithms[ args["algorithm"] ]["description"] + "...\t", end = "")
-        result = algorithms.algorithms[ args["algorithm"] ][ "algorithm" ](employees_df, tasks_df, gains)
+        if "checkpoint_path" in args:
+            result = algorithms.algorithms[ args["algorithm"] ][ "algorithm" ](
+                employees_df, tasks_df, gains,
+                checkpoint_path = args["checkpoint_path"],
+                resume = args.get("resume", False)
+            )
+        else:
+            result = algorithms.algorithms[ args["algorithm"] ][ "algorithm" ](employees_df, tasks_df, gains)
         print("Done (solution found)")
 
         # validate the solution; if invalid, an exception will be raised
@@ -124,19 +151,50 @@ def main():
         utils.validate_solution( result["solution"] )
         print("Done (solution valid)")
 
+        # certify the solution against the problem instance, i.e. check that it only references
+        # existing employees and tasks and that the reported total gain is correct
+        print("Certifying the solution...\t", end = "")
+        tasks_preprocessed = [ task for task in tasks if task["name"] in tasks_df.index ]
+        certificate = utils.certify_solution( result["solution"], result["total gain"], employees_df, tasks_df, gains, tasks_preprocessed )
+        if not certificate["valid"]:
+            raise Exception("Solution invalid:\n\t" + "\n\t".join( certificate["discrepancies"] ))
+        print("Done (solution certified)")
+
         # if we get here, the solution is valid
 
         # print out the solution
         print("Solution:\n")
         print( utils.solution_to_string( result["solution"] ) )
 
-        # compute the statistics
-        net_profit = utils.compute_net_profit( [ task for task in tasks if task["name"] in tasks_df.index ], result["total gain"] )
+        # the statistics have already been recomputed by the certifier
+        net_profit = certificate["net profit"]
 
         # print out the statistics
         print("Total gain: " + str(result["total gain"]) )
         print("Net profit: " + str(net_profit) )
         print("Running time: " + str( round(result["running time"], 5) ) + "sec")
+        if "completion cache" in result:
+            print("Completion cache: " + str(result["completion cache"]["hits"]) + " hits, " + str(result["completion cache"]["misses"]) + " misses")
+        if "gain distribution" in result:
+            distribution = result["gain distribution"]
+            print("Gain distribution: min " + str(min(distribution)) + ", mean " + str( round(sum(distribution) / len(distribution), 2) ) + ", max " + str(max(distribution)) + " (best seed: " + str(result["best seed"]) + ")")
+        if "upper bound" in result:
+            print("Upper bound: " + str(result["upper bound"]) + " (gap " + str( round(100 * result["gap"], 2) ) + "%)")
+        if "optimal" in result:
+            if result["optimal"]:
+                print("Optimality: proven optimal (" + str(result["nodes"]) + " nodes)")
+            else:
+                print("Optimality: not proven optimal (" + str(result["nodes"]) + " nodes)")
+        if "winner" in result:
+            if result["winner"] is None:
+                print("Portfolio: no algorithm found a valid solution within the time budget")
+            else:
+                print("Portfolio: won by " + algorithms.algorithms[ result["winner"] ]["description"] + " after " + str( round(result["time to solution"], 5) ) + "sec")
+            if len(result["terminated"]) > 0:
+                print("Portfolio: terminated " + ", ".join( algorithms.algorithms[code]["description"] for code in result["terminated"] ))
+            for code, error in sorted( result["failed"].items() ):
+                print("Portfolio: failed " + algorithms.algorithms[code]["description"] + " (see the error output)")
+                sys.stderr.write("Portfolio member " + code + " (" + algorithms.algorithms[code]["description"] + ") failed:\n" + error + "\n")
 
     except Exception as e:
         print("\n")
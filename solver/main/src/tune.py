@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import time
+import random
+import itertools
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import utils
+from main import open_file
+from algorithms import simulatedannealing
+from algorithms.greedyheuristic import greedy_heuristic
+from algorithms.utils import make_completion_check
+
+
+# The values of the Simulated Annealing hyperparameters that are raced against each other;
+# every combination of the values is a candidate configuration.
+candidate_space = {
+    "alpha": [ 0.75, 0.85, 0.95 ],
+    "beta": [ 1.05, 1.2 ],
+    "min_temp": [ 1, 5 ],
+    "initial_phase_length": [ 10, 50 ],
+    "n_change_parameter": [ 1, 2, 3 ]
+}
+
+settings = {
+    "time_limit": 60,           # a run that does not reach the target gain within this many seconds is stopped
+    "elimination_factor": 1.5,  # after each instance, configurations slower than the best one by this factor are dropped
+    "min_instances": 3,         # no configuration is dropped before the configurations are raced on this many instances
+    "n_workers": None,          # the number of worker processes, None means one per CPU core
+    "seed": 0                   # the runs on the i-th instance are seeded with seed + i
+}
+
+
+def get_help():
+    help_text = "Usage: python3 tune.py  <instances_file>  <results_file>\n\n"
+    help_text += "Each line of the instances file specifies one problem instance:\n"
+    help_text += "\t<employees_file>  <tasks_file>  [target_gain]\n"
+    help_text += "If the target gain is omitted, the total gain of the greedy heuristic is used.\n"
+    help_text += "Results are appended to the results file; rerunning with the same file resumes the tuning.\n"
+
+    return help_text
+
+
+def parse_args(argv):
+    if len(argv) != 3:
+        raise Exception("Incorrect number of parameters\n" + get_help())
+
+    return {
+        "instances_path": argv[1],
+        "results_path": argv[2]
+    }
+
+
+# Parse the instances file.
+#
+# @return a list of dictionaries, each with the paths to the employees and tasks files and (optionally) the target gain
+def parse_instances(file_content):
+    instances = []
+    for line in file_content.splitlines():
+        fields = line.split()
+        if len(fields) == 0:
+            continue
+
+        if len(fields) not in (2, 3):
+            raise Exception('Error parsing instances file: expected "<employees_file> <tasks_file> [target_gain]" but found "' + line + '"')
+
+        instances.append({
+            "employees_path": fields[0],
+            "tasks_path": fields[1],
+            "target gain": int(fields[2]) if len(fields) == 3 else None
+        })
+
+    return instances
+
+
+# Open, parse, validate and preprocess a problem instance, as done by main.py.
+#
+# @return ( employees_df, tasks_df, gains )
+def load_instance(employees_path, tasks_path):
+    employees = utils.parse_employees( "".join( open_file(employees_path).split() ) )
+    utils.validate_employees(employees)
+
+    tasks = utils.parse_tasks( "".join( open_file(tasks_path).split() ) )
+    utils.validate_tasks(tasks)
+
+    return utils.perform_preprocessing(employees, tasks)
+
+
+def get_n_workers():
+    return settings["n_workers"] or os.cpu_count()
+
+
+def get_configurations():
+    names = sorted(candidate_space)
+
+    return [ dict( zip(names, values) ) for values in itertools.product( *[ candidate_space[name] for name in names ] ) ]
+
+
+def get_key(configuration):
+    return json.dumps(configuration, sort_keys = True)
+
+
+# A run is identified by the instance itself rather than by its position in the instances file, so that
+# the results stay correct when the file is edited between the runs of the tuner.
+def get_instance_key(employees_path, tasks_path, target_gain):
+    return ( os.path.abspath(employees_path), os.path.abspath(tasks_path), target_gain )
+
+
+# The result of a run also depends on the seed and the time limit of the run, so these are part of its key as well.
+def get_run_key(configuration_key, instance_key, seed, time_limit):
+    return ( configuration_key, instance_key, seed, time_limit )
+
+
+def get_record_run_key(record):
+    instance_key = get_instance_key( record["employees path"], record["tasks path"], record["target gain"] )
+
+    return get_run_key( record["configuration"], instance_key, record["seed"], record["time limit"] )
+
+
+# Load the results of the runs completed so far, so that the tuning can be resumed. The records are keyed by
+# get_run_key(...), so the records of instances that are no longer in the instances file, or of runs with another
+# target gain, seed or time limit, are never looked up. The records in an older format are skipped.
+#
+# @return a dictionary mapping the run key to the result of the run
+def load_results(results_path):
+    results = {}
+    if not os.path.exists(results_path):
+        return results
+
+    for line in open_file(results_path).splitlines():
+        if line.strip() == "":
+            continue
+        record = json.loads(line)
+
+        if any( field not in record for field in ("employees path", "tasks path", "target gain", "seed", "time limit") ):
+            continue
+
+        results[ get_record_run_key(record) ] = record
+
+    return results
+
+
+# The instances are loaded by each worker process only once and reused for all its runs.
+worker_instances = {}
+
+
+# Run Simulated Annealing with the given configuration on an instance until it reaches the target gain
+# or runs out of time. The run is executed in a worker process, so changing the module's hyperparameters
+# does not affect any other run.
+#
+# @return the result of the run as a dictionary
+def run_configuration(configuration, instance, target_gain, seed):
+    paths = ( instance["employees_path"], instance["tasks_path"] )
+    if paths not in worker_instances:
+        worker_instances[paths] = load_instance(*paths)
+    employees_df, tasks_df, gains = worker_instances[paths]
+
+    simulatedannealing.hyperparameters.update(configuration)
+    random.seed(seed)
+    np.random.seed(seed)
+
+    start_time = time.time()
+    completion_check = make_completion_check( employees_df, tasks_df, simulatedannealing.hyperparameters["completion_cache_size"] )
+    solution, total_gain = simulatedannealing.simulated_annealing(
+        employees_df, tasks_df, gains,
+        completion_check = completion_check,
+        stop_cost = target_gain,
+        time_limit = settings["time_limit"]
+    )
+    end_time = time.time()
+
+    return {
+        "configuration": get_key(configuration),
+        "employees path": os.path.abspath( instance["employees_path"] ),
+        "tasks path": os.path.abspath( instance["tasks_path"] ),
+        "total gain": total_gain,
+        "target gain": target_gain,
+        "seed": seed,
+        "time limit": settings["time_limit"],
+        "reached": total_gain >= target_gain,
+        "running time": end_time - start_time
+    }
+
+
+# The score of a configuration is its total running time over the instances raced so far, where the runs
+# that did not reach the target gain are penalised with twice the time limit.
+#
+# @param runs - a list of ( instance key, seed ) pairs of the runs on the instances raced so far
+def compute_score(key, runs, results):
+    score = 0
+    for instance_key, seed in runs:
+        record = results[ get_run_key( key, instance_key, seed, settings["time_limit"] ) ]
+        score += record["running time"] if record["reached"] else 2 * settings["time_limit"]
+
+    return score
+
+
+# Race the candidate configurations on the instances, one instance at a time. All the configurations still in
+# the race are run on the instance in parallel, and once they have been raced on "min_instances" instances, the
+# configurations that are too slow compared to the best one are dropped from the race after each instance. Note,
+# the running times are wall-clock times of runs sharing the CPU cores, hence the elimination is only done once
+# enough of them have been summed up.
+#
+# @return a list of ( configuration, score ) pairs of the configurations that survived the race, best first
+def race(instances, target_gains, results_path):
+    instance_keys = [
+        get_instance_key( instance["employees_path"], instance["tasks_path"], target_gains[instance_index] )
+        for instance_index, instance in enumerate(instances)
+    ]
+    seeds = [ settings["seed"] + instance_index for instance_index in range( len(instances) ) ]
+    results = load_results(results_path)
+    alive = get_configurations()
+
+    with ProcessPoolExecutor( max_workers = get_n_workers() ) as executor, open(results_path, "a") as results_file:
+        for instance_index, instance in enumerate(instances):
+            futures = [
+                executor.submit( run_configuration, configuration, instance, target_gains[instance_index], seeds[instance_index] )
+                for configuration in alive
+                if get_run_key( get_key(configuration), instance_keys[instance_index], seeds[instance_index], settings["time_limit"] ) not in results
+            ]
+
+            for future in as_completed(futures):
+                record = future.result()
+                results[ get_record_run_key(record) ] = record
+
+                # persist every result as soon as it is known
+                results_file.write( json.dumps(record) + "\n" )
+                results_file.flush()
+
+            runs = list( zip( instance_keys, seeds ) )[0 : instance_index + 1]
+            scores = { get_key(configuration): compute_score( get_key(configuration), runs, results ) for configuration in alive }
+
+            if instance_index + 1 >= settings["min_instances"]:
+                best_score = min( scores.values() )
+                alive = [ configuration for configuration in alive if scores[ get_key(configuration) ] <= settings["elimination_factor"] * best_score ]
+
+            print("Instance " + str(instance_index + 1) + "/" + str( len(instances) ) + ": " + str( len(alive) ) + " configurations left")
+
+    ranking = sorted( ( (configuration, scores[ get_key(configuration) ]) for configuration in alive ), key = lambda item: item[1] )
+
+    return ranking
+
+
+def main():
+    try:
+        args = parse_args(sys.argv)
+        instances = parse_instances( open_file(args["instances_path"]) )
+
+        if len(instances) == 0:
+            raise Exception("No instances to tune on")
+
+        # compute the missing target gains with the (seeded) greedy heuristic
+        target_gains = []
+        for instance in instances:
+            target_gain = instance["target gain"]
+            if target_gain is None:
+                employees_df, tasks_df, gains = load_instance( instance["employees_path"], instance["tasks_path"] )
+                target_gain = greedy_heuristic( employees_df, tasks_df, gains, random_state = np.random.RandomState( settings["seed"] ) )[1]
+            target_gains.append(target_gain)
+
+        print("Racing " + str( len( get_configurations() ) ) + " configurations on " + str( len(instances) ) + " instances...")
+        ranking = race(instances, target_gains, args["results_path"])
+
+        print("\nRanking (total time, runs not reaching the target penalised with " + str( 2 * settings["time_limit"] ) + "sec):")
+        print("Note, the times are wall-clock times measured with up to " + str( get_n_workers() ) + " runs sharing the CPU cores at once")
+        for configuration, score in ranking:
+            print("\t" + str( round(score, 5) ) + "sec\t" + get_key(configuration))
+
+        print("\nBest configuration: " + get_key( ranking[0][0] ))
+
+    except Exception as e:
+        print("\n")
+        print(e)
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,5 @@
 from .parsing import parse_employees, parse_tasks
-from .validation import validate_employees, validate_tasks, validate_solution
+from .validation import validate_employees, validate_tasks, validate_solution, certify_solution
 from .preprocessing import perform_preprocessing
 from .printing import employees_to_string, tasks_to_string, solution_to_string
 from .statistics import compute_net_profit
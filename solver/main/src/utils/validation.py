@@ -1,3 +1,7 @@
+import numpy as np
+from .statistics import compute_net_profit
+
+
 # Check if the file does not violate the requirements of the problem
 # specification language. Specifically, no two entities in the same file
 # can have the same name.
@@ -34,3 +38,97 @@ def validate_solution(solution):
     # and the set will be different
     if len(employees_used) != len( set(employees_used) ):
         raise Exception("Solution invalid")
+
+
+# Get a short, printable summary of a (possibly very long) list of names.
+# Only the first few names are listed so that reports stay readable for large solutions.
+def summarise_names(names, limit = 10):
+    names = sorted( set(names) )
+    output = ", ".join( names[0 : limit] )
+
+    if len(names) > limit:
+        output += " and " + str( len(names) - limit ) + " more"
+
+    return output
+
+
+# Certify the solution against the problem instance. Unlike validate_solution(...), which only
+# checks the assignment constraint, the certifier also checks that all the referenced employees
+# and tasks exist, recomputes which tasks are completed by the assigned employees and compares
+# the resulting total gain with the one reported by the algorithm.
+#
+# All the checks are performed in a single vectorised pass over the skill matrices, so the
+# certifier stays fast even for solutions with millions of assignments.
+#
+# @param solution - a set of (employee, task) pairs
+# @param total_gain - the total gain reported by the algorithm
+# @param tasks - a list of tasks (as parsed by the parser) that remained after preprocessing,
+#                used to compute the net profit
+# @return report - a dictionary with the recomputed statistics and the list of discrepancies
+#                  found; the solution is valid only if the list is empty
+def certify_solution(solution, total_gain, employees_df, tasks_df, gains, tasks):
+    discrepancies = []
+
+    employee_names = [ item[0] for item in solution ]
+    task_names = [ item[1] for item in solution ]
+
+    # map the names onto row positions in the skill matrices; unknown names are mapped to -1
+    employee_idx = employees_df.index.get_indexer(employee_names)
+    task_idx = tasks_df.index.get_indexer(task_names)
+
+    unknown_employees = employee_idx == -1
+    if unknown_employees.any():
+        names = [ employee_names[i] for i in np.flatnonzero(unknown_employees) ]
+        discrepancies.append("unknown employees: " + summarise_names(names))
+
+    unknown_tasks = task_idx == -1
+    if unknown_tasks.any():
+        names = [ task_names[i] for i in np.flatnonzero(unknown_tasks) ]
+        discrepancies.append("unknown tasks: " + summarise_names(names))
+
+    # an employee can only be assigned to one task; the assignments to unknown tasks count as well
+    assignments_per_employee = np.bincount( employee_idx[~unknown_employees], minlength = len(employees_df.index) )
+    if ( assignments_per_employee > 1 ).any():
+        names = employees_df.index[ assignments_per_employee > 1 ]
+        discrepancies.append("employees assigned to more than one task: " + summarise_names(names))
+
+    # the remaining checks only make sense for assignments referencing existing entities
+    known = ~( unknown_employees | unknown_tasks )
+    employee_idx = employee_idx[known]
+    task_idx = task_idx[known]
+
+    employee_skills = employees_df.to_numpy() != 0
+    task_skills = tasks_df.to_numpy() != 0
+
+    # compute the skills offered collectively to each task by the employees assigned to it;
+    # the assignments are grouped by task so that the skill encodings of each group can be
+    # OR-ed together in one reduction
+    offered_skills = np.zeros( task_skills.shape, dtype = bool )
+    assigned = np.zeros( len(tasks_df.index), dtype = bool )
+    if len(task_idx) > 0:
+        order = np.argsort( task_idx, kind = "stable" )
+        sorted_task_idx = task_idx[order]
+        group_starts = np.flatnonzero( np.r_[ True, sorted_task_idx[1:] != sorted_task_idx[:-1] ] )
+        group_tasks = sorted_task_idx[group_starts]
+
+        offered_skills[group_tasks] = np.logical_or.reduceat( employee_skills[ employee_idx[order] ], group_starts, axis = 0 )
+        assigned[group_tasks] = True
+
+    # a task is completed if it has employees assigned and none of its skills is left uncovered
+    completed = assigned & ~( task_skills & ~offered_skills ).any(axis = 1)
+
+    gain_values = np.array( [ gains[task_name] for task_name in tasks_df.index ], dtype = np.int64 )
+    recomputed_gain = int( gain_values[completed].sum() )
+
+    if recomputed_gain != total_gain:
+        discrepancies.append("reported total gain (" + str(total_gain) + ") does not match the recomputed total gain (" + str(recomputed_gain) + ")")
+
+    report = {
+        "valid": len(discrepancies) == 0,
+        "discrepancies": discrepancies,
+        "completed tasks": set( tasks_df.index[completed] ),
+        "total gain": recomputed_gain,
+        "net profit": compute_net_profit(tasks, recomputed_gain)
+    }
+
+    return report
@@ -0,0 +1,84 @@
+import os
+import sys
+import random
+import warnings
+import numpy as np
+
+sys.path.insert( 0, os.path.join( os.path.dirname( os.path.abspath(__file__) ), "..", "main", "src" ) )
+
+import utils
+from algorithms import batchedannealing, simulatedannealing
+
+
+def generate_instance(n_employees, n_tasks, n_skills, seed = 0):
+    r = random.Random(seed)
+    skills = [ "skill" + str(i) for i in range(n_skills) ]
+
+    employees = ",".join(
+        "employee" + str(i) + "{" + ",".join( r.sample( skills, r.randint(1, 4) ) ) + "}"
+        for i in range(n_employees)
+    )
+    tasks = ",".join(
+        "task" + str(i) + "[" + str( r.randint(1, 500) ) + "][" + str( r.randint(1, 200) ) + "]{" + ",".join( r.sample( skills, r.randint(1, 4) ) ) + "}"
+        for i in range(n_tasks)
+    )
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return utils.perform_preprocessing( utils.parse_employees(employees), utils.parse_tasks(tasks) )
+
+
+# Recompute the coverage matrix and the cost of a configuration from scratch.
+def compute_coverage_and_cost(task_of, problem):
+    coverage = np.zeros( problem["task skills"].shape, dtype = np.int32 )
+    np.add.at( coverage, task_of, problem["employee skills"] )
+    completed = batchedannealing.is_completed( coverage, problem["task skills"] )
+
+    return coverage, int( problem["gains"][completed].sum() )
+
+
+# Compare the batched cost differences with the cost differences recomputed from scratch for every neighbour, then
+# move to one of the neighbours and check that the incrementally updated state matches the recomputed one.
+def check_cost_differences(n_employees, n_tasks, n_skills):
+    employees_df, tasks_df, gains = generate_instance(n_employees, n_tasks, n_skills)
+    problem = batchedannealing.build_problem(employees_df, tasks_df, gains)
+    rng = np.random.default_rng(0)
+
+    task_of = batchedannealing.sample_tasks( np.arange( len(employees_df.index) ), problem, rng )
+    coverage, cost = compute_coverage_and_cost(task_of, problem)
+    completed = batchedannealing.is_completed( coverage, problem["task skills"] )
+
+    previous_n = simulatedannealing.hyperparameters["n_change_parameter"]
+    try:
+        for n in [ 1, 2, 3, 5 ]:
+            simulatedannealing.hyperparameters["n_change_parameter"] = n
+
+            for _ in range(10):
+                employees, new_tasks, cost_differences = batchedannealing.evaluate_neighbours(50, task_of, coverage, completed, problem, rng)
+
+                for k in range(50):
+                    assert len( set(employees[k]) ) == n
+
+                    neighbour = task_of.copy()
+                    neighbour[ employees[k] ] = new_tasks[k]
+                    assert cost_differences[k] == compute_coverage_and_cost(neighbour, problem)[1] - cost
+
+                chosen = int( np.argmax(cost_differences) )
+                batchedannealing.apply_neighbour( employees[chosen], new_tasks[chosen], task_of, coverage, completed, problem )
+                cost += int( cost_differences[chosen] )
+
+                expected_coverage, expected_cost = compute_coverage_and_cost(task_of, problem)
+                assert ( coverage == expected_coverage ).all()
+                assert cost == expected_cost
+    finally:
+        simulatedannealing.hyperparameters["n_change_parameter"] = previous_n
+
+
+# Up to 64 employees, the employees of each neighbour are sampled by sorting random keys.
+def test_cost_differences_few_employees():
+    check_cost_differences(40, 20, 8)
+
+
+# Above 64 employees, the employees of each neighbour are sampled with rejection of repeated employees.
+def test_cost_differences_many_employees():
+    check_cost_differences(150, 40, 10)
@@ -0,0 +1,54 @@
+import os
+import sys
+import random
+import itertools
+import warnings
+
+sys.path.insert( 0, os.path.join( os.path.dirname( os.path.abspath(__file__) ), "..", "main", "src" ) )
+
+import utils
+from algorithms.bounds import compute_upper_bound
+
+
+# Generate a tiny random instance, small enough for the optimum to be found by brute force.
+def generate_tiny_instance(r):
+    skills = [ "s" + str(i) for i in range( r.randint(2, 5) ) ]
+    employee_skills = [ r.sample( skills, r.randint( 1, len(skills) ) ) for _ in range( r.randint(1, 5) ) ]
+
+    # the tasks only require skills offered by some employee, so that preprocessing does not remove all of them
+    offered = sorted( set().union(*employee_skills) )
+
+    employees = ",".join( "e" + str(i) + "{" + ",".join(skill_list) + "}" for i, skill_list in enumerate(employee_skills) )
+    tasks = ",".join(
+        "t" + str(i) + "[" + str( r.randint(1, 100) ) + "][" + str( r.randint(0, 20) ) + "]{" + ",".join( r.sample( offered, r.randint( 1, len(offered) ) ) ) + "}"
+        for i in range( r.randint(1, 4) )
+    )
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return utils.perform_preprocessing( utils.parse_employees(employees), utils.parse_tasks(tasks) )
+
+
+# Find the optimal total gain by trying every assignment of the employees to the tasks (or to no task).
+def compute_optimum(employees_df, tasks_df, gains):
+    employee_skills = employees_df.to_numpy() != 0
+    task_skills = tasks_df.to_numpy() != 0
+    task_gains = [ gains[task_name] for task_name in tasks_df.index ]
+
+    optimum = 0
+    for assignment in itertools.product( range( len(task_gains) + 1 ), repeat = len(employees_df.index) ):
+        total_gain = 0
+        for task in range( len(task_gains) ):
+            offered = employee_skills[ [ e for e, t in enumerate(assignment) if t == task ] ].any(axis = 0)
+            if ( offered | ~task_skills[task] ).all():
+                total_gain += task_gains[task]
+        optimum = max(optimum, total_gain)
+
+    return optimum
+
+
+def test_upper_bound_is_not_below_optimum():
+    r = random.Random(0)
+    for _ in range(150):
+        employees_df, tasks_df, gains = generate_tiny_instance(r)
+        assert compute_upper_bound(employees_df, tasks_df, gains) >= compute_optimum(employees_df, tasks_df, gains)
@@ -0,0 +1,53 @@
+import os
+import sys
+import random
+import warnings
+
+sys.path.insert( 0, os.path.join( os.path.dirname( os.path.abspath(__file__) ), "..", "main", "src" ) )
+
+import utils
+from algorithms import branchandbound
+
+
+# Generate a large dense instance, where every task requires most of the skills and every employee offers only
+# a few of them, so that the tasks have very many minimal covers.
+def generate_dense_instance(n_employees, n_tasks, n_skills, min_task_skills, seed = 0):
+    r = random.Random(seed)
+    skills = [ "skill" + str(i) for i in range(n_skills) ]
+
+    employees = ",".join(
+        "employee" + str(i) + "{" + ",".join( r.sample( skills, r.randint(1, 3) ) ) + "}"
+        for i in range(n_employees)
+    )
+    tasks = ",".join(
+        "task" + str(i) + "[" + str( r.randint(100, 500) ) + "][" + str( r.randint(1, 50) ) + "]{" + ",".join( r.sample( skills, r.randint(min_task_skills, n_skills) ) ) + "}"
+        for i in range(n_tasks)
+    )
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return utils.perform_preprocessing( utils.parse_employees(employees), utils.parse_tasks(tasks) )
+
+
+def run_with_time_limit(time_limit, employees_df, tasks_df, gains):
+    previous_time_limit = branchandbound.hyperparameters["time_limit"]
+    branchandbound.hyperparameters["time_limit"] = time_limit
+    try:
+        return branchandbound.branch_and_bound_solver(employees_df, tasks_df, gains)
+    finally:
+        branchandbound.hyperparameters["time_limit"] = previous_time_limit
+
+
+# The solver must stop at its time limit on a large dense instance that it cannot solve within it, and report
+# the best solution found as not proven optimal. The wall-clock check is loose, so that it does not fail on a slow
+# machine, but it would still catch a search that ignores the limit (which ran for minutes on this instance).
+def test_respects_time_limit_on_large_dense_instance():
+    time_limit = 1
+    employees_df, tasks_df, gains = generate_dense_instance(300, 150, 14, 5)
+    result = run_with_time_limit(time_limit, employees_df, tasks_df, gains)
+
+    assert not result["optimal"]
+    assert result["nodes"] > 0
+    assert result["total gain"] < result["upper bound"]
+    assert result["gap"] > 0
+    assert result["running time"] < 30 * time_limit
@@ -0,0 +1,123 @@
+import os
+import sys
+import json
+import random
+import subprocess
+import warnings
+import numpy as np
+import pytest
+
+src_path = os.path.join( os.path.dirname( os.path.abspath(__file__) ), "..", "main", "src" )
+problems_path = os.path.join( os.path.dirname( os.path.abspath(__file__) ), "problems" )
+sys.path.insert(0, src_path)
+
+import utils
+from algorithms import simulatedannealing
+
+
+# Run Simulated Annealing on the test problem in a separate Python process, so that the runs can use different
+# hash seeds (and thus different orders of the skill columns and of the iteration over sets).
+run_script = """
+import sys, json, random, warnings
+import numpy as np
+sys.path.insert(0, sys.argv[1])
+import utils
+from algorithms import simulatedannealing
+
+employees_path, tasks_path, checkpoint_path, time_limit, resume = sys.argv[2:7]
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore")
+    employees = utils.parse_employees( "".join( open(employees_path).read().split() ) )
+    tasks = utils.parse_tasks( "".join( open(tasks_path).read().split() ) )
+    employees_df, tasks_df, gains = utils.perform_preprocessing(employees, tasks)
+
+simulatedannealing.hyperparameters["alpha"] = 0.7   # a shorter search than the default one, to keep the test fast
+if time_limit != "none":    # save a checkpoint at every iteration, so that the run stops right after one
+    simulatedannealing.hyperparameters["checkpoint_interval"] = 0
+random.seed(0)
+np.random.seed(0)
+solution, total_gain = simulatedannealing.simulated_annealing(
+    employees_df, tasks_df, gains,
+    time_limit = None if time_limit == "none" else float(time_limit),
+    checkpoint_path = None if checkpoint_path == "none" else checkpoint_path,
+    resume = resume == "resume"
+)
+print( json.dumps( { "solution": sorted(solution), "total gain": total_gain } ) )
+"""
+
+
+def run_in_process(hash_seed, checkpoint_path = "none", time_limit = "none", resume = "fresh"):
+    env = dict(os.environ)
+    env["PYTHONHASHSEED"] = str(hash_seed)
+
+    output = subprocess.run(
+        [ sys.executable, "-c", run_script, src_path,
+          os.path.join(problems_path, "employees1"), os.path.join(problems_path, "tasks1"),
+          checkpoint_path, str(time_limit), resume ],
+        env = env, capture_output = True, text = True, check = True
+    )
+
+    return json.loads( output.stdout.strip().splitlines()[-1] )
+
+
+# A run that is stopped and then resumed from its checkpoint, even in a process with a different hash seed,
+# must end with exactly the same solution as an uninterrupted run.
+def test_resume_matches_uninterrupted_run(tmp_path):
+    checkpoint_path = str( tmp_path / "sa.ckpt" )
+
+    uninterrupted = run_in_process(0)
+
+    run_in_process(0, checkpoint_path, time_limit = 0.3)
+    assert os.path.exists(checkpoint_path)  # the run was stopped before finishing
+
+    resumed = run_in_process(1, checkpoint_path, resume = "resume")
+
+    assert resumed == uninterrupted
+    assert not os.path.exists(checkpoint_path)  # the checkpoint is deleted once the search finishes
+
+
+def load_problem(employees, tasks):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return utils.perform_preprocessing( utils.parse_employees(employees), utils.parse_tasks(tasks) )
+
+
+# Create a checkpoint by stopping a run on the given problem right after its first checkpoint.
+def create_checkpoint(checkpoint_path, employees_df, tasks_df, gains):
+    previous_interval = simulatedannealing.hyperparameters["checkpoint_interval"]
+    simulatedannealing.hyperparameters["checkpoint_interval"] = 0
+    try:
+        random.seed(0)
+        np.random.seed(0)
+        simulatedannealing.simulated_annealing(employees_df, tasks_df, gains, time_limit = 0.05, checkpoint_path = checkpoint_path)
+    finally:
+        simulatedannealing.hyperparameters["checkpoint_interval"] = previous_interval
+
+    assert os.path.exists(checkpoint_path)
+
+
+employees = "e1{a,b},e2{c},e3{a},e4{b,c},e5{a,c}"
+tasks = "t1[100][10]{a,c},t2[50][5]{b},t3[30][1]{a,b,c}"
+
+
+def test_resume_refuses_checkpoint_of_different_instance(tmp_path):
+    checkpoint_path = str( tmp_path / "sa.ckpt" )
+    create_checkpoint( checkpoint_path, *load_problem(employees, tasks) )
+
+    other_employees_df, other_tasks_df, other_gains = load_problem(employees, tasks.replace("t2[50]", "t2[60]"))
+    with pytest.raises(Exception, match = "different problem instance"):
+        simulatedannealing.simulated_annealing(other_employees_df, other_tasks_df, other_gains, checkpoint_path = checkpoint_path, resume = True)
+
+
+def test_resume_refuses_checkpoint_with_different_hyperparameters(tmp_path):
+    checkpoint_path = str( tmp_path / "sa.ckpt" )
+    employees_df, tasks_df, gains = load_problem(employees, tasks)
+    create_checkpoint(checkpoint_path, employees_df, tasks_df, gains)
+
+    previous_alpha = simulatedannealing.hyperparameters["alpha"]
+    simulatedannealing.hyperparameters["alpha"] = previous_alpha / 2
+    try:
+        with pytest.raises(Exception, match = "different hyperparameters"):
+            simulatedannealing.simulated_annealing(employees_df, tasks_df, gains, checkpoint_path = checkpoint_path, resume = True)
+    finally:
+        simulatedannealing.hyperparameters["alpha"] = previous_alpha
@@ -0,0 +1,71 @@
+import os
+import sys
+import warnings
+
+sys.path.insert( 0, os.path.join( os.path.dirname( os.path.abspath(__file__) ), "..", "main", "src" ) )
+
+import utils
+
+
+def load_problem():
+    employees = utils.parse_employees("e1{a,b},e2{c},e3{a},e4{b,c}")
+    tasks = utils.parse_tasks("t1[100][10]{a,c},t2[50][5]{b},t3[30][1]{a,b,c}")
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        employees_df, tasks_df, gains = utils.perform_preprocessing(employees, tasks)
+
+    return employees_df, tasks_df, gains, tasks
+
+
+def certify(solution, total_gain):
+    employees_df, tasks_df, gains, tasks = load_problem()
+
+    return utils.certify_solution(solution, total_gain, employees_df, tasks_df, gains, tasks)
+
+
+def test_valid_solution():
+    report = certify( { ("e3", "t1"), ("e2", "t1"), ("e1", "t2"), ("e4", "t3") }, 165 )
+
+    assert report["valid"]
+    assert report["discrepancies"] == []
+    assert report["completed tasks"] == { "t1", "t2" }
+    assert report["total gain"] == 165
+    assert report["net profit"] == 165 - 16
+
+
+def test_unknown_employee():
+    report = certify( { ("e3", "t1"), ("e2", "t1"), ("ghost", "t2") }, 110 )
+
+    assert not report["valid"]
+    assert report["discrepancies"] == [ "unknown employees: ghost" ]
+
+
+def test_unknown_task():
+    report = certify( { ("e1", "t2"), ("e2", "nope") }, 55 )
+
+    assert not report["valid"]
+    assert report["discrepancies"] == [ "unknown tasks: nope" ]
+
+
+def test_employee_assigned_twice():
+    report = certify( { ("e1", "t2"), ("e1", "t3"), ("e2", "t3"), ("e4", "t3") }, 55 + 31 )
+
+    assert not report["valid"]
+    assert report["discrepancies"] == [ "employees assigned to more than one task: e1" ]
+
+
+# The assignments to unknown tasks still count towards the assignments of the employee.
+def test_employee_assigned_twice_including_unknown_task():
+    report = certify( { ("e1", "t2"), ("e1", "nope") }, 55 )
+
+    assert not report["valid"]
+    assert report["discrepancies"] == [ "unknown tasks: nope", "employees assigned to more than one task: e1" ]
+
+
+def test_wrong_total_gain():
+    report = certify( { ("e3", "t1"), ("e2", "t1") }, 165 )
+
+    assert not report["valid"]
+    assert report["discrepancies"] == [ "reported total gain (165) does not match the recomputed total gain (110)" ]
+    assert report["total gain"] == 110